@@ -0,0 +1,101 @@
+"""
+Bot decisions worked out from plain entity columns. Nothing in here touches pygame or Player objects
+so the exact same code runs in the game process and in ai_workers processes over shared memory.
+Ties between equally near targets go to the lower entity id so every path picks the same target
+"""
+
+import math
+
+from weapons import WEAPONS
+
+# fire decisions
+HOLD, RELOAD, FIRE = 0, 1, 2  # gun not ready / ready but target out of range (timer still resets) / shoot
+
+
+class Decisions:
+    """Output columns indexed by entity id"""
+
+    def __init__(self, target, move_x, move_y, fire):
+        self.target = target  # entity id to fight, -1 for none
+        self.move_x = move_x
+        self.move_y = move_y
+        self.fire = fire
+
+    @classmethod
+    def blank(cls, capacity):
+        return cls([-1] * capacity, [0.0] * capacity, [0.0] * capacity, [HOLD] * capacity)
+
+
+def intent(sx, sy, tx, ty, timer, fire_interval, view_range, preferred_distance):
+    """Movement intent and fire decision for a bot at (sx, sy) fighting a target at (tx, ty)"""
+    # shooting is measured from the bot's center, bots are slower on the trigger than humans
+    fire = HOLD
+    if timer >= fire_interval * 2:
+        fire = FIRE if math.hypot(tx - sx - 16, ty - sy - 16) <= view_range else RELOAD
+
+    # keep around the preferred distance, no intent means the mover slows us down
+    dx, dy = tx - sx, ty - sy
+    dist = math.hypot(dx, dy)
+    if dist == 0 or dist > view_range:
+        return 0.0, 0.0, fire
+    if dist < preferred_distance - 20:  # too close, move away
+        return -dx / dist, -dy / dist, fire
+    if dist > preferred_distance + 20:  # too far, move closer
+        return dx / dist, dy / dist, fire
+    return 0.0, 0.0, fire
+
+
+def _grid(xs, ys, alive, cell_size):
+    cells = {}
+    for eid in range(len(alive)):
+        if alive[eid]:
+            key = (int(xs[eid] // cell_size), int(ys[eid] // cell_size))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [eid]
+            else:
+                bucket.append(eid)
+    return cells
+
+
+def decide(xs, ys, alive, timers, weapons, bot_ids, view_range, preferred_distance, out, targets=None):
+    """Fill out (Decisions) for every id in bot_ids. targets optionally gives already worked out
+    nearest target ids (-1 for none), otherwise they get searched for with a grid the size of view_range"""
+    cells = None
+    if targets is None:
+        cells = _grid(xs, ys, alive, view_range)
+
+    for eid in bot_ids:
+        sx, sy = xs[eid], ys[eid]
+
+        if cells is None:
+            target = int(targets[eid])
+        else:
+            # nearest living player in view range from the 3x3 cells around us
+            target = -1
+            best = math.inf
+            cx, cy = int(sx // view_range), int(sy // view_range)
+            for gy in (cy - 1, cy, cy + 1):
+                for gx in (cx - 1, cx, cx + 1):
+                    for other in cells.get((gx, gy), ()):
+                        if other == eid:
+                            continue
+                        dist = math.hypot(xs[other] - sx, ys[other] - sy)
+                        if dist > view_range:
+                            continue
+                        if dist < best or (dist == best and other < target):
+                            best = dist
+                            target = other
+
+        out.target[eid] = target
+        if target == -1:
+            out.move_x[eid] = 0.0
+            out.move_y[eid] = 0.0
+            out.fire[eid] = HOLD
+            continue
+
+        move_x, move_y, fire = intent(sx, sy, xs[target], ys[target], timers[eid],
+                                      WEAPONS[weapons[eid]].fire_interval, view_range, preferred_distance)
+        out.move_x[eid] = move_x
+        out.move_y[eid] = move_y
+        out.fire[eid] = fire
@@ -0,0 +1,166 @@
+"""
+Bot decisions spread over worker processes for big matches. Every tick the game process copies the
+player columns into one shared memory block, each worker runs ai.decide for its own range of entity
+ids and writes the decisions into that range of the block. Workers only read what was published and
+never write outside their range, so the decisions come out the same as deciding in process no matter
+how many workers there are
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import ai
+
+# column name, dtype. inputs are published by the game, outputs are written by the workers
+_INPUTS = (("x", "f8"), ("y", "f8"), ("alive", "u1"), ("bot", "u1"), ("shoot_timer", "i4"), ("weapon", "i1"))
+_OUTPUTS = (("target", "i4"), ("move_x", "f8"), ("move_y", "f8"), ("fire", "u1"))
+
+
+def _layout(capacity):
+    """Offsets of every column in the block, each one 8 byte aligned"""
+    offsets = {}
+    size = 0
+    for name, dtype in _INPUTS + _OUTPUTS:
+        offsets[name] = (size, np.dtype(dtype))
+        size += (capacity * np.dtype(dtype).itemsize + 7) & ~7
+    return offsets, max(size, 1)
+
+
+def _columns(shm, capacity):
+    offsets, _ = _layout(capacity)
+    return {name: np.ndarray((capacity,), dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, (offset, dtype) in offsets.items()}
+
+
+"""
+:WORKER PROCESS
+"""
+
+
+def _attach(name, capacity):
+    # workers share the game process's resource tracker, the block only gets unlinked once by the game
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, _columns(shm, capacity)
+
+
+def _worker(name, capacity, view_range, preferred_distance, conn):
+    shm, cols = _attach(name, capacity)
+    while True:
+        message = conn.recv()
+        if message[0] == "stop":
+            break
+        if message[0] == "map":  # the game grew its block
+            del cols
+            shm.close()
+            _, name, capacity = message
+            shm, cols = _attach(name, capacity)
+            conn.send(True)
+            continue
+
+        _, count, start, stop = message
+        # plain lists are a lot faster to index one element at a time than numpy arrays
+        xs = cols["x"][:count].tolist()
+        ys = cols["y"][:count].tolist()
+        alive = cols["alive"][:count].tolist()
+        bot = cols["bot"][start:stop].tolist()
+        bot_ids = [start + i for i in range(stop - start) if bot[i]]
+
+        out = ai.Decisions.blank(count)
+        ai.decide(xs, ys, alive, cols["shoot_timer"][:count].tolist(), cols["weapon"][:count].tolist(),
+                  bot_ids, view_range, preferred_distance, out)
+
+        cols["target"][start:stop] = out.target[start:stop]
+        cols["move_x"][start:stop] = out.move_x[start:stop]
+        cols["move_y"][start:stop] = out.move_y[start:stop]
+        cols["fire"][start:stop] = out.fire[start:stop]
+        conn.send(True)
+
+    del cols
+    shm.close()
+
+
+"""
+:GAME PROCESS
+"""
+
+
+class AIWorkerPool:
+    def __init__(self, num_workers, view_range, preferred_distance, capacity=256):
+        self.capacity = capacity
+        self._shm = shared_memory.SharedMemory(create=True, size=_layout(capacity)[1])
+        self._cols = _columns(self._shm, capacity)
+
+        # fork keeps worker start up cheap and doesn't re-run the game's main module, the workers never
+        # touch pygame. Platforms without fork fall back to their default
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self._conns = []
+        self._workers = []
+        for i in range(num_workers):
+            conn, child_conn = context.Pipe()
+            worker = context.Process(target=_worker, name=f"ai-worker-{i}", daemon=True,
+                                     args=(self._shm.name, capacity, view_range, preferred_distance, child_conn))
+            worker.start()
+            child_conn.close()
+            self._conns.append(conn)
+            self._workers.append(worker)
+
+    def _grow(self, capacity):
+        while self.capacity < capacity:
+            self.capacity *= 2
+        old = self._shm
+        del self._cols
+        self._shm = shared_memory.SharedMemory(create=True, size=_layout(self.capacity)[1])
+        self._cols = _columns(self._shm, self.capacity)
+        for conn in self._conns:
+            conn.send(("map", self._shm.name, self.capacity))
+        for conn in self._conns:
+            conn.recv()
+        old.close()
+        old.unlink()
+
+    def decide(self, store, bot_ids):
+        """Publish the store's columns, let the workers decide for bot_ids and return ai.Decisions"""
+        count = store.capacity
+        if count > self.capacity:
+            self._grow(count)
+
+        cols = self._cols
+        cols["x"][:count] = store.x
+        cols["y"][:count] = store.y
+        cols["alive"][:count] = store.alive
+        cols["shoot_timer"][:count] = store.shoot_timer
+        cols["weapon"][:count] = store.weapon
+        bot = cols["bot"]
+        bot[:count] = 0
+        bot[bot_ids] = 1
+
+        # split the bots evenly, every worker gets one contiguous range of entity ids
+        bot_ids = sorted(bot_ids)
+        per_worker = -(-len(bot_ids) // len(self._conns)) or 1
+        busy = []
+        for conn, first in zip(self._conns, range(0, len(bot_ids), per_worker)):
+            last = min(first + per_worker, len(bot_ids)) - 1
+            conn.send(("decide", count, bot_ids[first], bot_ids[last] + 1))
+            busy.append(conn)
+        for conn in busy:
+            conn.recv()
+
+        return ai.Decisions(cols["target"][:count].tolist(), cols["move_x"][:count].tolist(),
+                            cols["move_y"][:count].tolist(), cols["fire"][:count].tolist())
+
+    def close(self):
+        for conn in self._conns:
+            try:
+                conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self._workers:
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.terminate()
+        del self._cols
+        self._shm.close()
+        self._shm.unlink()
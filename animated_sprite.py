@@ -1,35 +1,109 @@
+import heapq
 import pygame
 
-_anim_store: set = {}
+_anim_store: dict = {}  # animation name -> SpriteAnimation
+_frame_cache: dict = {}  # (path, frame_count, frame_width, frame_height, size) -> list of frame surfaces
+_finish_queue: list = []  # heap of (end_time, seq, animator, play_id) for non looping animations
+
+_clock = 0.0  # shared animation clock in seconds, every animator reads from this
+_seq = 0
+
 
 class SpriteAnimation:
-    
-    def __init__(self, name: str, spritesheet_path: str, frame_count, frame_width, frame_height, frame_duration = .1):
+    """A named animation, the spritesheet is sliced once and the frames are shared by every animator playing it"""
+
+    def __init__(self, name: str, spritesheet_path: str, frame_count, frame_width, frame_height, frame_duration = .1, loop = True, size = None):
         self.name = name
-        self.sprite = pygame.image.load(spritesheet_path).convert_alpha() # sprite sheet
+        self.frames = load_frames(spritesheet_path, frame_count, frame_width, frame_height, size)
         self.frame_count = frame_count # number of uniform frames in spritesheet
-        self.frame_elapsed = 0.0
         self.frame_duration = frame_duration # duration of a frame in seconds
         self.frame_width = frame_width
         self.frame_height = frame_height
-        def empty():
-            print("empty animation func")
-        self.finished_func = empty
-        
-        _add_to_anim_set(self)
-
-    @staticmethod
-    def play(name, finished_func):
-        anim : SpriteAnimation
-        for a in _anim_store:
-            if a.name == name:
-                anim = a
-        
+        self.loop = loop
+        self.length = frame_count * frame_duration # total duration in seconds
+
+        _anim_store[name] = self
+
+    def frame_at(self, elapsed):
+        index = int(elapsed / self.frame_duration)
+        if self.loop:
+            return self.frames[index % self.frame_count]
+        return self.frames[min(index, self.frame_count - 1)]
+
+
+class Animator:
+    """Per entity playback state. Frames are worked out from the shared clock when drawn so idle
+    animators cost nothing per tick, only non looping animations with a finished func get queued"""
+    __slots__ = ("anim", "start_time", "finished_func", "play_id")
+
+    def __init__(self, name=None):
+        self.anim = None
+        self.start_time = 0.0
+        self.finished_func = None
+        self.play_id = 0
+        if name is not None:
+            self.play(name)
+
+    def play(self, name, finished_func=None, restart=False):
+        global _seq
+        anim = _anim_store.get(name)
         if anim is None:
-            print("did not find animation")
+            raise KeyError(f"no animation registered as {name!r}")
+
+        # keep playing if this animation is already running
+        if anim is self.anim and not restart and finished_func is None:
             return
-            
-        # play the animation
 
-def _add_to_anim_set(anim):
-    _anim_store.add(anim)
\ No newline at end of file
+        self.anim = anim
+        self.start_time = _clock
+        self.finished_func = finished_func
+        self.play_id += 1
+
+        if finished_func is not None and not anim.loop:
+            _seq += 1
+            heapq.heappush(_finish_queue, (_clock + anim.length, _seq, self, self.play_id))
+
+    @property
+    def frame(self):
+        return self.anim.frame_at(_clock - self.start_time)
+
+    @property
+    def finished(self):
+        return not self.anim.loop and _clock - self.start_time >= self.anim.length
+
+
+def load_frames(spritesheet_path, frame_count, frame_width, frame_height, size=None):
+    """Slice a spritesheet into frames, frames are laid out left to right then top to bottom"""
+    key = (spritesheet_path, frame_count, frame_width, frame_height, size)
+    frames = _frame_cache.get(key)
+    if frames is not None:
+        return frames
+
+    sheet = pygame.image.load(spritesheet_path).convert_alpha()
+    columns = max(1, sheet.get_width() // frame_width)
+    frames = []
+    for i in range(frame_count):
+        x = (i % columns) * frame_width
+        y = (i // columns) * frame_height
+        frame = sheet.subsurface(pygame.Rect(x, y, frame_width, frame_height)).copy()
+        if size is not None:
+            frame = pygame.transform.scale(frame, size)
+        frames.append(frame)
+
+    _frame_cache[key] = frames
+    return frames
+
+
+def get_animation(name):
+    return _anim_store.get(name)
+
+
+def update_animations(dt):
+    """Advance every animator in one go, only finished callbacks need any per animator work"""
+    global _clock
+    _clock += dt
+
+    while _finish_queue and _finish_queue[0][0] <= _clock:
+        _, _, animator, play_id = heapq.heappop(_finish_queue)
+        if animator.play_id == play_id:  # skip animations that were replaced before they finished
+            animator.finished_func()
@@ -2,21 +2,44 @@ import pygame
 import random
 import os
 import colors
+import utils
 from pygame import mask
 
+_solid_masks: dict = {}  # (width, height) -> fully set mask, shared by every collision test
+_building_sprites: dict = {}  # (building type, rotation) -> (original wall, wall, floor, collision mask)
+
+
+def _solid_mask(width, height):
+    solid = _solid_masks.get((width, height))
+    if solid is None:
+        solid = mask.Mask((width, height), fill=True)
+        _solid_masks[(width, height)] = solid
+    return solid
+
+
+def _load_building(building_type, rotation):
+    """Load, rotate and mask a building type once, every building of that type and rotation shares it"""
+    key = (building_type, rotation)
+    cached = _building_sprites.get(key)
+    if cached is None:
+        original_wall = pygame.image.load(f"res/buildings/building_{building_type}.png").convert_alpha()
+        original_floor = pygame.image.load(f"res/buildings/building_floor_{building_type}.png").convert_alpha()
+        wall = pygame.transform.rotate(original_wall, rotation)
+        floor = pygame.transform.rotate(original_floor, rotation)
+        cached = (original_wall, wall, floor, mask.from_surface(wall))
+        _building_sprites[key] = cached
+    return cached
+
+
 class Buildings:
     def __init__(self, x, y, building_type=1, rotation=0):
         self.pos = pygame.Vector2(x, y)
         self.building_type = building_type
         self.rotation = rotation  # Rotation in degrees
         
-        # Load original wall and floor sprites
-        self.original_wall_sprite = pygame.image.load(f"res/buildings/building_{building_type}.png").convert_alpha()
-        self.original_floor_sprite = pygame.image.load(f"res/buildings/building_floor_{building_type}.png").convert_alpha()
-        
-        # Rotate sprites
-        self.wall_sprite = pygame.transform.rotate(self.original_wall_sprite, self.rotation)
-        self.floor_sprite = pygame.transform.rotate(self.original_floor_sprite, self.rotation)
+        # Shared wall and floor sprites rotated for this building, plus the wall collision mask
+        self.original_wall_sprite, self.wall_sprite, self.floor_sprite, self.collision_mask = \
+            _load_building(building_type, rotation)
         
         # Set dimensions based on rotated sprite size
         self.width = self.wall_sprite.get_width()
@@ -26,24 +49,22 @@ class Buildings:
         self.rect = self.wall_sprite.get_rect(center=(x + self.original_wall_sprite.get_width() // 2, 
                                                      y + self.original_wall_sprite.get_height() // 2))
         self.pos = pygame.Vector2(self.rect.x, self.rect.y)  # Update position to match the rect
-        
-        # Generate collision mask from rotated wall sprite
-        self.collision_mask = mask.from_surface(self.wall_sprite)
-        self.collision_outline = self.collision_mask.outline()
-        
-        # Adjust collision outline to world coordinates
-        self.world_collision_outline = [(self.pos.x + point[0], self.pos.y + point[1]) 
-                                        for point in self.collision_outline]
+    
+    @property
+    def world_collision_outline(self):
+        # only the debug drawing uses this so it's worked out on demand
+        return [(self.pos.x + point[0], self.pos.y + point[1]) 
+                for point in self.collision_mask.outline()]
     
     def draw(self, screen, camera):
         # Get camera-adjusted position for both sprites
-        camera_rect = camera.apply_rect(self.rect)
+        screen_pos = camera.world_to_screen_pos(self.rect.x, self.rect.y)
         
         # Draw floor sprite first
-        screen.blit(self.floor_sprite, camera_rect.topleft)
+        screen.blit(utils.scaled_sprite(self.floor_sprite, camera.scale), screen_pos)
         
         # Draw wall sprite on top
-        screen.blit(self.wall_sprite, camera_rect.topleft)
+        screen.blit(utils.scaled_sprite(self.wall_sprite, camera.scale), screen_pos)
         
         # Debug: Draw collision outline
         # camera_outline = [(camera.world_to_screen_pos(x, y)) for x, y in self.world_collision_outline]
@@ -57,28 +78,25 @@ class Buildings:
             return False
         
         # If the bounding rects collide, do a more precise check with the mask
-        # Create a rect for the object relative to the building's position
-        rel_rect = pygame.Rect(
-            rect.x - self.pos.x,
-            rect.y - self.pos.y,
-            rect.width,
-            rect.height
-        )
-        
-        # Create a mask for the object
-        obj_mask = mask.Mask((rel_rect.width, rel_rect.height), fill=True)
-        
-        # Check if the masks overlap
-        offset = (rel_rect.x, rel_rect.y)
+        # using a cached solid mask of the object's size at its offset from the building
+        obj_mask = _solid_mask(rect.width, rect.height)
+        offset = (int(rect.x - self.pos.x), int(rect.y - self.pos.y))
         return self.collision_mask.overlap(obj_mask, offset) is not None
 
-def create_buildings(WORLD_WIDTH, WORLD_HEIGHT, num_buildings = 30):
+def create_buildings(WORLD_WIDTH, WORLD_HEIGHT, num_buildings = 30, rng = random):
     """Create buildings for the game world"""
-    buildings = []
+    return [Buildings(x, y, building_type, rotation)
+            for x, y, building_type, rotation in generate_layout(WORLD_WIDTH, WORLD_HEIGHT, num_buildings, rng)]
+
+
+def generate_layout(WORLD_WIDTH, WORLD_HEIGHT, num_buildings = 30, rng = random):
+    """Pick building placements, returns (x, y, building type, rotation) tuples. Pass a seeded
+    random.Random as rng to get the same layout every time"""
+    layout = []
     
-    # Get available building types
+    # Get available building types, sorted so a seed gives the same map on every machine
     building_types = []
-    for file in os.listdir("res/buildings"):
+    for file in sorted(os.listdir("res/buildings")):
         if file.startswith("building_") and file.endswith(".png") and not "floor" in file:
             # Extract the building type number
             type_num = int(file.split("_")[1].split(".")[0])
@@ -95,19 +113,17 @@ def create_buildings(WORLD_WIDTH, WORLD_HEIGHT, num_buildings = 30):
     
     for _ in range(num_buildings):
         # Randomly select a building type
-        building_type = random.choice(building_types)
+        building_type = rng.choice(building_types)
         
-        # Load the sprite to get its dimensions
-        temp_sprite = pygame.image.load(f"res/buildings/building_{building_type}.png").convert_alpha()
-        width = temp_sprite.get_width()
-        height = temp_sprite.get_height()
+        # Get the sprite dimensions
+        width, height = _load_building(building_type, 0)[0].get_size()
         
         # Try to find a position that doesn't overlap with existing buildings
         max_attempts = 50
         for attempt in range(max_attempts):
             # Generate random position
-            x = random.randint(50, WORLD_WIDTH - width - 50)
-            y = random.randint(50, WORLD_HEIGHT - height - 50)
+            x = rng.randint(50, WORLD_WIDTH - width - 50)
+            y = rng.randint(50, WORLD_HEIGHT - height - 50)
             
             # Create a rect for this position
             new_rect = pygame.Rect(x, y, width, height)
@@ -125,8 +141,8 @@ def create_buildings(WORLD_WIDTH, WORLD_HEIGHT, num_buildings = 30):
             if not overlap:
                 building_rects.append(new_rect)
                 # Generate random rotation (0, 90, 180, or 270 degrees)
-                rotation = random.choice([0, 90, 180, 270])
-                buildings.append(Buildings(x, y, building_type, rotation))
+                rotation = rng.choice([0, 90, 180, 270])
+                layout.append((x, y, building_type, rotation))
                 break
     
-    return buildings
+    return layout
@@ -6,13 +6,15 @@ class Camera:
         self.rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
         self.width = SCREEN_WIDTH
         self.height = SCREEN_HEIGHT
+        self.scale = 1.0  # render target pixels per world pixel
+        self._view = pygame.Rect(self.rect)  # reused by visible() so culling doesn't allocate
     
     def update(self, target):
         # Center the camera on the target
-        camera_pos = pygame.Vector2(
-            target.pos.x + target.rect.width // 2 - self.width // 2,
-            target.pos.y + target.rect.height // 2 - self.height // 2
-        )
+        self.look_at(target.x + target.rect.width // 2, target.y + target.rect.height // 2)
+
+    def look_at(self, world_x, world_y):
+        camera_pos = pygame.Vector2(world_x - self.width // 2, world_y - self.height // 2)
         
         # Keep the camera within world bounds (optional, can be removed for truly unbounded world)
         # camera_pos.x = max(0, min(camera_pos.x, WORLD_WIDTH - self.width))
@@ -20,27 +22,39 @@ class Camera:
         
         self.rect.x = camera_pos.x
         self.rect.y = camera_pos.y
+
+    def resize(self, width, height):
+        """Change how much of the world the camera sees, in world pixels"""
+        self.width = width
+        self.height = height
+        self.rect.size = (width, height)
     
     def apply(self, rect):
         # Return a rect with camera-adjusted coordinates
-        return pygame.Rect(rect.x - self.rect.x, rect.y - self.rect.y, 
-                          rect.width, rect.height)
+        return self.apply_rect(rect)
     
     def apply_rect(self, rect):
-        # Apply camera offset to a pygame Rect
+        # Apply camera offset and render scale to a pygame Rect
+        s = self.scale
         return pygame.Rect(
-            rect.x - self.rect.x,
-            rect.y - self.rect.y,
-            rect.width,
-            rect.height
+            (rect.x - self.rect.x) * s,
+            (rect.y - self.rect.y) * s,
+            rect.width * s,
+            rect.height * s
         )
     
     def world_to_screen_pos(self, world_x, world_y):
         # Convert world coordinates to screen coordinates
-        screen_pos = pygame.Vector2(world_x, world_y) - pygame.Vector2(self.rect.topleft)
-        return screen_pos.x, screen_pos.y
+        return (world_x - self.rect.x) * self.scale, (world_y - self.rect.y) * self.scale
     
     def screen_to_world_pos(self, screen_x, screen_y):
         # Convert screen coordinates to world coordinates
-        world_pos = pygame.Vector2(screen_x, screen_y) + pygame.Vector2(self.rect.topleft)
-        return world_pos.x, world_pos.y
+        return screen_x / self.scale + self.rect.x, screen_y / self.scale + self.rect.y
+
+    def visible(self, index, margin=32):
+        """Objects in a SpatialHash whose rect overlaps the camera. The margin keeps things like
+        rotated sprites that draw a bit outside their rect from popping at the screen edges"""
+        view = self._view
+        view.update(self.rect.x - margin, self.rect.y - margin,
+                    self.rect.width + margin * 2, self.rect.height + margin * 2)
+        return [obj for obj in index.query(view) if view.colliderect(obj.rect)]
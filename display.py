@@ -0,0 +1,86 @@
+"""
+Owns the window. The game draws into an offscreen target whose resolution follows the measured
+frame time, then the target gets scaled onto the window (or fullscreen display) in one go
+"""
+
+import pygame
+
+from globals import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, RENDER_SCALES
+
+
+class Display:
+    def __init__(self):
+        self.window = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
+        self.fullscreen = False
+        self.scale_index = 0
+        self.scale = RENDER_SCALES[0]
+        self.target = self._make_target()
+        self.present_rect = self.window.get_rect()
+
+        # frame time tracking
+        self.budget_ms = 1000 / FPS
+        self.avg_frame_ms = 0.0
+        self.slow_frames = 0
+        self.fast_frames = 0
+
+    def _make_target(self):
+        return pygame.Surface((int(SCREEN_WIDTH * self.scale), int(SCREEN_HEIGHT * self.scale))).convert()
+
+    def set_scale_index(self, index):
+        index = max(0, min(index, len(RENDER_SCALES) - 1))
+        if index == self.scale_index:
+            return
+        self.scale_index = index
+        self.scale = RENDER_SCALES[index]
+        self.target = self._make_target()
+
+    def toggle_fullscreen(self):
+        self.fullscreen = not self.fullscreen
+        if self.fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.window = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
+
+    def record_frame_time(self, frame_ms):
+        """Feed in how long update + draw took, drops the render scale when over budget and
+        raises it again once there is plenty of headroom"""
+        self.avg_frame_ms += (frame_ms - self.avg_frame_ms) * 0.1
+
+        if self.avg_frame_ms > self.budget_ms * 0.9:
+            self.slow_frames += 1
+            self.fast_frames = 0
+        elif self.avg_frame_ms < self.budget_ms * 0.5:
+            self.fast_frames += 1
+            self.slow_frames = 0
+        else:
+            self.slow_frames = 0
+            self.fast_frames = 0
+
+        # go down quick, come back up slow so the scale doesn't flicker
+        if self.slow_frames >= 30:
+            self.slow_frames = 0
+            self.set_scale_index(self.scale_index + 1)
+        elif self.fast_frames >= 180:
+            self.fast_frames = 0
+            self.set_scale_index(self.scale_index - 1)
+
+    def present(self):
+        # the window surface changes when it gets resized
+        self.window = pygame.display.get_surface()
+        win_w, win_h = self.window.get_size()
+
+        # fit the target inside the window keeping the aspect ratio, letterbox the rest
+        fit = min(win_w / SCREEN_WIDTH, win_h / SCREEN_HEIGHT)
+        w, h = int(SCREEN_WIDTH * fit), int(SCREEN_HEIGHT * fit)
+        self.present_rect = pygame.Rect((win_w - w) // 2, (win_h - h) // 2, w, h)
+
+        if self.present_rect.size != (win_w, win_h):
+            self.window.fill((0, 0, 0))
+        pygame.transform.scale(self.target, self.present_rect.size, self.window.subsurface(self.present_rect))
+        pygame.display.flip()
+
+    def window_to_target(self, pos):
+        """Convert a window position (like the mouse) into render target pixels"""
+        rect = self.present_rect
+        tw, th = self.target.get_size()
+        return ((pos[0] - rect.x) * tw / rect.width, (pos[1] - rect.y) * th / rect.height)
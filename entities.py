@@ -0,0 +1,131 @@
+"""
+Compact column storage for players. Each component is a flat array indexed by entity id,
+a Player object is just a thin handle holding its id so hundreds of bots stay small and
+systems can walk the columns directly instead of chasing attributes on objects
+"""
+
+from array import array
+
+import pygame
+
+
+class EntityStore:
+    def __init__(self):
+        # transform
+        self.x = array('d')
+        self.y = array('d')
+        self.rotation = array('d')
+        # collision box, always at x/y rounded. Rects are reused along with their id
+        self.rect = []
+        # velocity
+        self.vx = array('d')
+        self.vy = array('d')
+        # movement intent for this tick, -1 to 1 per axis, consumed by movement.move_players
+        self.move_x = array('d')
+        self.move_y = array('d')
+        self.sprint = array('b')
+        # health
+        self.health = array('d')
+        # timers
+        self.shoot_timer = array('i')
+        # equipment, index into weapons.WEAPONS
+        self.weapon = array('b')
+
+        self.alive = array('b')
+        self.free_ids = []  # dead ids waiting to be recycled
+        self.count = 0  # number of living entities
+
+    def spawn(self, x, y, health=100, width=32, height=32):
+        """Create an entity and return its id, ids of dead entities get reused first"""
+        if self.free_ids:
+            eid = self.free_ids.pop()
+            self.x[eid] = x
+            self.y[eid] = y
+            self.rect[eid].update(x, y, width, height)
+            self.rotation[eid] = 0
+            self.vx[eid] = 0
+            self.vy[eid] = 0
+            self.move_x[eid] = 0
+            self.move_y[eid] = 0
+            self.sprint[eid] = 0
+            self.health[eid] = health
+            self.shoot_timer[eid] = 0
+            self.weapon[eid] = 0
+            self.alive[eid] = 1
+        else:
+            eid = len(self.alive)
+            self.x.append(x)
+            self.y.append(y)
+            self.rect.append(pygame.Rect(x, y, width, height))
+            self.rotation.append(0)
+            self.vx.append(0)
+            self.vy.append(0)
+            self.move_x.append(0)
+            self.move_y.append(0)
+            self.sprint.append(0)
+            self.health.append(health)
+            self.shoot_timer.append(0)
+            self.weapon.append(0)
+            self.alive.append(1)
+        self.count += 1
+        return eid
+
+    def despawn(self, eid):
+        if not self.alive[eid]:
+            return
+        self.alive[eid] = 0
+        self.free_ids.append(eid)
+        self.count -= 1
+
+    def move(self, eid, x, y):
+        self.x[eid] = x
+        self.y[eid] = y
+        self.rect[eid].topleft = (x, y)
+
+    def sync_rects(self, width=32, height=32):
+        """Put every rect back on its x/y after the columns were overwritten wholesale (snapshot restore)"""
+        rects = self.rect
+        del rects[len(self.x):]
+        while len(rects) < len(self.x):
+            rects.append(pygame.Rect(0, 0, width, height))
+        xs, ys = self.x, self.y
+        for eid, rect in enumerate(rects):
+            rect.topleft = (xs[eid], ys[eid])
+
+    @property
+    def capacity(self):
+        return len(self.alive)
+
+    def alive_ids(self):
+        alive = self.alive
+        return [eid for eid in range(len(alive)) if alive[eid]]
+
+
+"""
+:SYSTEMS
+"""
+
+
+def tick_timers(store):
+    timers = store.shoot_timer
+    alive = store.alive
+    for eid in range(len(alive)):
+        if alive[eid]:
+            timers[eid] += 1
+
+
+def damage_outside(store, area, damage, width=32, height=32, hit_ids=None):
+    """Damage every entity whose bounding box is not fully inside area, ids of the damaged
+    entities get appended to hit_ids if one is passed"""
+    xs, ys, health, alive = store.x, store.y, store.health, store.alive
+    left, top, right, bottom = area.left, area.top, area.right, area.bottom
+    for eid in range(len(alive)):
+        if not alive[eid]:
+            continue
+        x = int(xs[eid])
+        y = int(ys[eid])
+        if x < left or y < top or x + width > right or y + height > bottom:
+            health[eid] -= damage
+            if hit_ids is not None:
+                hit_ids.append(eid)
+
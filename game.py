@@ -1,74 +1,72 @@
 import pygame
-import random
 import colors
 
-import buildings
+import entities
+import simulation
+import animated_sprite
 
-from player import Player
 from game_state import GameState
+from player import Player, draw_player, draw_projectile
+from kill_circle import draw_safe_area
+from ai_workers import AIWorkerPool
 from camera import Camera
-from globals import WORLD_WIDTH, WORLD_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT
-from kill_circle import KillCircle
+from globals import WORLD_WIDTH, WORLD_HEIGHT, FPS
 from ground import Ground
+from display import Display
+from particles import ParticleSystem
+from telemetry import Telemetry
+from world_layer import WorldLayer
+from spectator import Spectator
 
 game_state = GameState()
-_screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+game_state.effects = ParticleSystem()
+_display = Display()
+_screen = _display.target  # offscreen render target, swapped out when the render scale changes
 main_camera = Camera()
-kill_circle = KillCircle()
 ground = Ground()
+render_camera = Camera()  # pipelined mode draws with its own camera, main_camera belongs to the simulation
+world_layer = WorldLayer(ground, game_state.building_index)  # shared by every spectator camera
+spectator = Spectator(world_layer)
 
 _building_cnt = 10
+_map_seed = None  # set to reuse a cached map, None makes a new one every launch
 
 """ 
 :SETUP
 """
 
 
-def create_buildings():
-    game_state.buildings = buildings.create_buildings(
-        WORLD_WIDTH, WORLD_HEIGHT, _building_cnt)
-
-
-""" Create 9 AI players spread across the world (ensuring they don't spawn inside walls)
-Create 1 human player in the center of the world (ensuring they don't spawn inside walls) """
-
-
-def spawn_players():
-    for _ in range(9):
-        valid_spawn = False
-        while not valid_spawn:
-            spawn_pos = pygame.Vector2(
-                random.randint(0, WORLD_WIDTH - 32),
-                random.randint(0, WORLD_HEIGHT - 32)
-            )
-            player_rect = pygame.Rect(spawn_pos.x, spawn_pos.y, 32, 32)
-            valid_spawn = True
-            for obj in game_state.buildings:
-                if obj.collides_with(player_rect):
-                    valid_spawn = False
-                    break
-        game_state.players.append(Player(spawn_pos.x, spawn_pos.y))
-
-    valid_spawn = False
-    spawn_pos = pygame.Vector2(WORLD_WIDTH // 2, WORLD_HEIGHT // 2)
-    while not valid_spawn:
-        player_rect = pygame.Rect(spawn_pos.x, spawn_pos.y, 32, 32)
-        valid_spawn = True
-        for obj in game_state.buildings:
-            if obj.collides_with(player_rect):
-                # Try a bit to the right and down
-                spawn_pos += pygame.Vector2(50, 50)
-                player_rect = pygame.Rect(spawn_pos.x, spawn_pos.y, 32, 32)
-                if not obj.collides_with(player_rect):
-                    valid_spawn = True
-                    break
-                else:
-                    valid_spawn = False
-
-    human_player = Player(spawn_pos.x, spawn_pos.y, is_human=True)
-    human_player.color = colors.BLUE  # Blue color for human player
-    game_state.human_player = human_player
-    game_state.players.append(human_player)
+def create_buildings(seed=None):
+    simulation.create_buildings(game_state, _building_cnt, _map_seed if seed is None else seed)
+    world_layer.clear()
+
+
+def start_telemetry(path):
+    game_state.telemetry = Telemetry(path)
+
+
+def stop_telemetry():
+    if game_state.telemetry is not None:
+        game_state.telemetry.close()
+        game_state.telemetry = None
+
+
+def start_ai_workers(num_workers):
+    game_state.ai_workers = AIWorkerPool(num_workers, Player.view_range, Player.preferred_distance)
+
+
+def stop_ai_workers():
+    if game_state.ai_workers is not None:
+        game_state.ai_workers.close()
+        game_state.ai_workers = None
+
+
+def spawn_loot():
+    simulation.spawn_loot(game_state)
+
+
+def spawn_players(human=True):
+    simulation.spawn_players(game_state, human=human)
 
 
 """
@@ -76,81 +74,55 @@ def spawn_players():
 """
 
 
-def update_players(keys):
+def update_players(keys, aim=None):
+    """aim is (world x, world y, fire) when the mouse was already read on another thread"""
     # Handle human player updates if it exists
     if game_state.human_player in game_state.players:
         # Handle movement
-        game_state.human_player.handle_movement(
-            keys, game_state.buildings, game_state.players)
-
-        # Update camera to follow human player
-        main_camera.update(game_state.human_player)
+        game_state.human_player.handle_movement(keys)
 
         # Handle shooting
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_buttons = pygame.mouse.get_pressed()
-        game_state.human_player.handle_shooting(
-            keys, mouse_pos, mouse_buttons, main_camera, game_state.projectiles)
-
-     # Update players
-    for player in game_state.players[:]:
-        if player.is_human:
-            player.update(game_state.projectiles,
-                          game_state.players, game_state.buildings)
+        if aim is not None:
+            game_state.human_player.aim_and_shoot(*aim, game_state.projectiles)
         else:
-            player.update(game_state.projectiles,
-                          game_state.players, game_state.buildings)
-            # AI players move towards nearest player if one is found
-            nearest = player.find_nearest(game_state.players)
-            if nearest:
-                player.move_towards(
-                    nearest, game_state.buildings, game_state.players)
+            mouse_pos = _display.window_to_target(pygame.mouse.get_pos())
+            mouse_buttons = pygame.mouse.get_pressed()
+            game_state.human_player.handle_shooting(
+                keys, mouse_pos, mouse_buttons, main_camera, game_state.projectiles)
 
+    # timers tick after the human shot and before the bots act, same firing cadence as before the store
+    entities.tick_timers(game_state.entities)
 
-def update_projectiles():
-    # update projectiles
-    for projectile in game_state.projectiles[:]:
-        projectile.update()
+    # Update players
+    simulation.update_players(game_state)
 
-    handle_projectile_collisions(
-        game_state.projectiles, game_state.players, game_state.buildings)
+    # Update camera to follow human player once everyone has moved
+    if game_state.human_player in game_state.players:
+        main_camera.update(game_state.human_player)
 
 
-""" handle the projectile collisions """
+def update_projectiles():
+    simulation.update_projectiles(game_state)
+
 
+def update_animations():
+    # the game runs on fixed ticks so the animation clock does too
+    animated_sprite.update_animations(1 / FPS)
 
-def handle_projectile_collisions(projectiles, players, buildings):
-    for projectile in projectiles[:]:
-        if projectile in projectiles:  # Check if projectile still exists
-            # Check collision with buildings
-            for obj in buildings:
-                if obj.collides_with(projectile.rect):
-                    if projectile in projectiles:  # Double-check before removing
-                        projectiles.remove(projectile)
-                    break
 
-            # If projectile still exists, check collision with players
-            if projectile in projectiles:
-                for player in players:
-                    if player != projectile.owner and player.rect.colliderect(projectile.rect):
-                        player.health -= 35
-                        if projectile in projectiles:  # Double-check before removing
-                            projectiles.remove(projectile)
-                        break
+def update_effects():
+    game_state.effects.update()
 
 
 def update_kill_circle():
-    kill_circle.update(game_state.players)
+    simulation.update_kill_circle(game_state)
 
 
 """ Cleanup dead players and expired projectiles and what not"""
 
 
 def expired_entity_cleanup():
-    # Remove dead players and expired projectiles
-    game_state.players[:] = [p for p in game_state.players if p.health > 0]
-    game_state.projectiles[:] = [
-        p for p in game_state.projectiles if p.lifetime > 0]
+    simulation.expired_entity_cleanup(game_state)
 
 
 """ 
@@ -159,14 +131,49 @@ def expired_entity_cleanup():
 
 
 def clear_screen():
+    # start of a frame, pick up the render target for the current scale
+    global _screen
+    _screen = _display.target
+    main_camera.scale = _display.scale
     _screen.fill(colors.BLACK)
 
 
+def present_frame():
+    _display.present()
+
+
+def record_frame_time(frame_ms):
+    _display.record_frame_time(frame_ms)
+
+
+def toggle_fullscreen():
+    _display.toggle_fullscreen()
+
+
+def spectating():
+    # nobody to play as, the human died or never spawned
+    return game_state.human_player not in game_state.players
+
+
+def set_spectator_views(count):
+    spectator.set_count(count)
+
+
+def draw_spectator():
+    clear_screen()
+    spectator.update(game_state)
+    spectator.draw(_screen, _display.scale, game_state)
+    _display.present()
+
+
 def draw_kill_circle():
-    kill_circle.draw(_screen, main_camera)
+    game_state.kill_circle.draw(_screen, main_camera)
 
 
 def draw_winner():
+    global _screen
+    _screen = _display.target
+    main_camera.scale = _display.scale
     _screen.fill(colors.WHITE)
     if game_state.players:
         winner = game_state.players[0]
@@ -180,8 +187,8 @@ def draw_winner():
         winner.draw(_screen, main_camera)
         font = pygame.font.SysFont(None, 36)
         text = font.render("Winner!", True, colors.BLACK)
-        _screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 50))
-    pygame.display.flip()
+        _screen.blit(text, (_screen.get_width()//2 - text.get_width()//2, 50))
+    _display.present()
 
 
 """ draw all debug elements """
@@ -195,18 +202,19 @@ def draw_debug():
 def draw_grid_lines():
     # Draw grid lines to show movement (optional)
     grid_size = 32
+    screen_width, screen_height = _screen.get_size()
     for x in range(0, WORLD_WIDTH, grid_size):
         _screen_x, _ = main_camera.world_to_screen_pos(x, 0)
-        if 0 <= _screen_x <= SCREEN_WIDTH:
+        if 0 <= _screen_x <= screen_width:
             pygame.draw.line(_screen, colors.GRAY,
                              (_screen_x, 0),
-                             (_screen_x, SCREEN_HEIGHT))
+                             (_screen_x, screen_height))
     for y in range(0, WORLD_HEIGHT, grid_size):
         _, _screen_y = main_camera.world_to_screen_pos(0, y)
-        if 0 <= _screen_y <= SCREEN_HEIGHT:
+        if 0 <= _screen_y <= screen_height:
             pygame.draw.line(_screen, colors.GRAY,
                              (0, _screen_y),
-                             (SCREEN_WIDTH, _screen_y))
+                             (screen_width, _screen_y))
 
 
 def draw_ground():
@@ -216,13 +224,20 @@ def draw_ground():
 def draw_debug_coords():
     if game_state.human_player in game_state.players:
         font = pygame.font.SysFont(None, 24)
-        coords_text = f"X: {int(game_state.human_player.pos.x)}, Y: {int(game_state.human_player.pos.y)}"
+        coords_text = f"X: {int(game_state.human_player.x)}, Y: {int(game_state.human_player.y)}"
         text_surface = font.render(coords_text, True, colors.BLACK)
         _screen.blit(text_surface, (10, 10))
 
 
+def draw_loot():
+    taken = game_state.loot.taken
+    for pickup in main_camera.visible(game_state.loot.index):
+        if not taken[pickup.pid]:
+            pickup.draw(_screen, main_camera)
+
+
 def draw_buildings():
-    for building in game_state.buildings:
+    for building in main_camera.visible(game_state.building_index):
         building.draw(_screen, main_camera)
 
 
@@ -230,7 +245,57 @@ def draw_buildings():
 
 
 def draw_camera_offset_entities():
-    for player in game_state.players:
+    # only what the camera can see, off screen entities cost nothing to draw
+    for player in main_camera.visible(game_state.player_index):
         player.draw(_screen, main_camera)
-    for projectile in game_state.projectiles:
+    for projectile in main_camera.visible(game_state.projectile_index):
         projectile.draw(_screen, main_camera)
+    game_state.effects.draw(_screen, main_camera)
+
+
+"""
+:PIPELINED
+"""
+
+
+def fill_render_snapshot(snap):
+    snap.fill(game_state)
+
+
+def read_aim():
+    """Mouse as (world x, world y, fire), through the camera of the frame the player is looking at"""
+    mouse_pos = _display.window_to_target(pygame.mouse.get_pos())
+    world_x, world_y = render_camera.screen_to_world_pos(mouse_pos[0], mouse_pos[1])
+    return world_x, world_y, pygame.mouse.get_pressed()[0]
+
+
+def draw_render_snapshot(snap):
+    """Draw a frame from a RenderSnapshot buffer, only reads the parts of game_state that never change
+    mid match. Doesn't present so the buffer can be handed back before the flip"""
+    global _screen
+    _screen = _display.target
+    render_camera.scale = _display.scale
+    _screen.fill(colors.BLACK)
+    if snap.has_focus:
+        render_camera.look_at(snap.focus_x, snap.focus_y)
+
+    ground.draw(_screen, render_camera)
+    for building in render_camera.visible(game_state.building_index):
+        building.draw(_screen, render_camera)
+    for pickup in render_camera.visible(game_state.loot.index):
+        if not snap.loot_taken[pickup.pid]:
+            pickup.draw(_screen, render_camera)
+    draw_safe_area(_screen, render_camera, snap.safe_area)
+
+    # snapshots aren't indexed, a rect check per entity is cheap next to drawing it
+    view = render_camera.rect.inflate(64, 64)
+    for i in range(snap.player_count):
+        if view.collidepoint(snap.center_x[i], snap.center_y[i]):
+            draw_player(_screen, render_camera, snap.frames[i], snap.center_x[i], snap.center_y[i],
+                        snap.x[i], snap.y[i], snap.rotation[i], snap.health[i])
+    for i in range(snap.projectile_count):
+        if view.collidepoint(snap.proj_center_x[i], snap.proj_center_y[i]):
+            draw_projectile(_screen, render_camera, snap.proj_center_x[i], snap.proj_center_y[i],
+                            snap.proj_width[i], snap.proj_height[i], snap.proj_rotation[i])
+    if snap.effects is not None:
+        snap.effects.draw(_screen, render_camera)
@@ -1,7 +1,26 @@
 from player import Player
+from entities import EntityStore
+from kill_circle import KillCircle
+from spatial import SpatialHash
+from loot import Loot
+from history import PositionHistory
 class GameState:
     def __init__(self):
+        self.tick = 0
+        self.entities = EntityStore()
         self.players = []
         self.projectiles = []
         self.buildings = []
+        self.map = None  # mapcache.MapData with the collision bitmap and nav grid for the buildings
+        self.kill_circle = KillCircle()
+        self.loot = Loot()
+        self.effects = None  # ParticleSystem when somebody is watching, headless worlds skip effects
+        self.telemetry = None  # Telemetry when the match is being recorded
+        self.history = PositionHistory()  # last few ticks of positions for rewinding late hits
+        self.ai_workers = None  # ai_workers.AIWorkerPool to decide for the bots in other processes
+
+        # spatial indexes, buildings are static, players and projectiles get rebuilt every tick
+        self.building_index = SpatialHash(256)
+        self.player_index = SpatialHash(128)
+        self.projectile_index = SpatialHash(128)
         self.human_player = Player
\ No newline at end of file
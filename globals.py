@@ -4,4 +4,8 @@ File for all the global variables and whatnot
 
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
 WORLD_WIDTH, WORLD_HEIGHT = 3000, 3000
-FPS = 60
\ No newline at end of file
+FPS = 60
+
+# dynamic resolution, the game view is always SCREEN_WIDTH x SCREEN_HEIGHT world pixels
+# but gets rendered at one of these scales depending on how long frames are taking
+RENDER_SCALES = (1.0, 0.85, 0.7, 0.5)
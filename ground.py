@@ -1,4 +1,5 @@
 import pygame
+import utils
 
 from globals import WORLD_WIDTH, WORLD_HEIGHT
 
@@ -12,11 +13,16 @@ class Ground:
     def draw(self, screen: pygame.Surface, camera):
         width = int(WORLD_WIDTH / self.width)
         height = int(WORLD_HEIGHT / self.height)
+        sprite = utils.scaled_sprite(self.sprite, camera.scale)
 
-        for y in range(0, height):
-            for x in range(0, width):
-                self_rect = pygame.Rect(x * self.width, y* self.height, self.width, self.height)
-                camera_rect = camera.apply(self_rect)
-                spr_rect = self.sprite.get_rect(center=camera_rect.center)
-                screen.blit(self.sprite, spr_rect.topleft)
+        # only the tiles under the camera
+        view = camera.rect
+        x_start = max(0, view.left // self.width)
+        x_end = min(width, view.right // self.width + 1)
+        y_start = max(0, view.top // self.height)
+        y_end = min(height, view.bottom // self.height + 1)
+
+        for y in range(y_start, y_end):
+            for x in range(x_start, x_end):
+                screen.blit(sprite, camera.world_to_screen_pos(x * self.width, y * self.height))
                 
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Where every entity was over the last few ticks, for checking hits against the world a shooter saw when
+their input arrives late (remote or replayed controls). A fixed number of ticks is kept in preallocated
+numpy rows written ring style, recording a tick is a couple of array copies out of the EntityStore
+columns, so memory and per tick cost only depend on the depth and entity count, not the match length
+"""
+
+import numpy as np
+
+
+class PositionHistory:
+    def __init__(self, depth=64, capacity=64):
+        self.depth = depth  # ticks kept, rewinding further back than this finds nothing
+        self.capacity = 0
+        self.ticks = np.full(depth, -1, dtype=np.int64)  # tick held by each row, -1 for none yet
+        self.x = self.y = self.alive = None
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        # only when the store gets ids it never had before, recycled ids reuse their column
+        capacity = max(capacity, self.capacity * 2, 1)
+        x = np.zeros((self.depth, capacity), dtype=np.float64)
+        y = np.zeros((self.depth, capacity), dtype=np.float64)
+        alive = np.zeros((self.depth, capacity), dtype=np.int8)
+        if self.capacity:
+            x[:, :self.capacity] = self.x
+            y[:, :self.capacity] = self.y
+            alive[:, :self.capacity] = self.alive
+        self.x, self.y, self.alive = x, y, alive
+        self.capacity = capacity
+
+    def clear(self):
+        self.ticks[:] = -1
+
+    def record(self, tick, store):
+        """Save where everything in store is at tick, overwriting whatever was depth ticks ago"""
+        count = store.capacity
+        if count > self.capacity:
+            self._grow(count)
+        row = tick % self.depth
+        self.ticks[row] = tick
+        if count:
+            self.x[row, :count] = np.frombuffer(store.x, dtype=np.float64)
+            self.y[row, :count] = np.frombuffer(store.y, dtype=np.float64)
+            self.alive[row, :count] = np.frombuffer(store.alive, dtype=np.int8)
+        self.alive[row, count:] = 0
+
+    """
+    :REWIND
+    """
+
+    def has_tick(self, tick):
+        return tick >= 0 and self.ticks[tick % self.depth] == tick
+
+    def position_at(self, eid, tick):
+        """(x, y) of eid at tick, None if that tick is out of the window or eid wasn't alive then"""
+        row = tick % self.depth
+        if tick < 0 or self.ticks[row] != tick or eid >= self.capacity or not self.alive[row, eid]:
+            return None
+        return float(self.x[row, eid]), float(self.y[row, eid])
+
+    def rect_at(self, eid, tick, rect):
+        """Move rect to where eid was at tick (keeping its size), returns False and leaves rect alone
+        if there's no record. Pass in a reused rect so rewinding doesn't allocate"""
+        pos = self.position_at(eid, tick)
+        if pos is None:
+            return False
+        rect.topleft = pos
+        return True
+
+
+if __name__ == "__main__":
+    # scripted check of rewound hits: python history.py
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    pygame.display.set_mode((1, 1))
+
+    import simulation
+    from game_state import GameState
+    from player import Player, Projectile
+
+    def shot_hits(state, x, y, lag):
+        target = state.players[1]
+        health = target.health
+        state.projectiles[:] = [Projectile(x, y, 0, 0, state.players[0], 10, 40, lag)]
+        simulation.handle_projectile_collisions(state.projectiles, state.players, state.buildings,
+                                                tick=state.tick, history=state.history)
+        hit = target.health < health
+        target.health = health
+        return hit
+
+    state = GameState()
+    state.players = [Player(state.entities, 100, 100), Player(state.entities, 400, 400)]
+    for _ in range(5):  # target sits at (400, 400) for a few ticks
+        state.history.record(state.tick, state.entities)
+        state.tick += 1
+    state.players[1].pos = (600, 600)  # then it moves away
+
+    assert shot_hits(state, 405, 410, lag=3), "lagged shot should hit where the target was"
+    assert not shot_hits(state, 605, 610, lag=3), "lagged shot shouldn't hit where the target is now"
+    assert shot_hits(state, 605, 610, lag=0), "unlagged shot should hit where the target is now"
+    assert not shot_hits(state, 405, 410, lag=0), "unlagged shot shouldn't hit where the target was"
+    assert shot_hits(state, 605, 610, lag=state.history.depth + 10), "past the window falls back to now"
+    print("rewind ok")
@@ -1,5 +1,6 @@
 import pygame
 import colors
+import entities
 from globals import WORLD_WIDTH, WORLD_HEIGHT
 
 class KillCircle:
@@ -8,7 +9,7 @@ class KillCircle:
         self.shrink_timer = 0
         self.damage = 1
     
-    def update(self, players):
+    def update(self, store, hit_ids=None):
         self.shrink_timer += 1
         if self.shrink_timer >= 1800:  # Shrink every 30 seconds
             self.shrink_timer = 0
@@ -21,11 +22,14 @@ class KillCircle:
             self.safe_area = pygame.Rect(new_pos.x, new_pos.y, new_width, new_height)
 
         # Damage players outside of area
-        for player in players:
-            if not self.safe_area.contains(player.rect):
-                player.health -= self.damage
+        entities.damage_outside(store, self.safe_area, self.damage, hit_ids=hit_ids)
 
     # Draw safe area with camera offset
     def draw(self, screen, main_cam): 
-        safe_area_camera = main_cam.apply_rect(self.safe_area)
-        pygame.draw.rect(screen, colors.RED, safe_area_camera, 5, border_radius=20)
\ No newline at end of file
+        draw_safe_area(screen, main_cam, self.safe_area)
+
+
+def draw_safe_area(screen, main_cam, safe_area):
+    safe_area_camera = main_cam.apply_rect(safe_area)
+    pygame.draw.rect(screen, colors.RED, safe_area_camera, max(1, int(5 * main_cam.scale)),
+                     border_radius=int(20 * main_cam.scale))
\ No newline at end of file
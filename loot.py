@@ -0,0 +1,113 @@
+"""
+Weapon pickups lying around the world. Pickups are spawned around buildings once and live in a
+spatial hash, taking one just flips its flag so nearest/touching queries never scan every item
+and snapshots only need to copy the flags
+"""
+
+import random
+import pygame
+
+import colors
+from weapons import WEAPONS, PISTOL
+from spatial import SpatialHash
+from globals import WORLD_WIDTH, WORLD_HEIGHT
+
+PICKUP_SIZE = 16
+
+
+class Pickup:
+    __slots__ = ("pid", "weapon_id", "pos", "rect")
+
+    def __init__(self, pid, weapon_id, x, y):
+        self.pid = pid
+        self.weapon_id = weapon_id
+        self.pos = pygame.Vector2(x, y)
+        self.rect = pygame.Rect(x, y, PICKUP_SIZE, PICKUP_SIZE)
+
+    def draw(self, screen, camera):
+        x, y = camera.world_to_screen_pos(self.rect.x, self.rect.y)
+        size = max(1, int(PICKUP_SIZE * camera.scale))
+        pygame.draw.rect(screen, WEAPONS[self.weapon_id].color, (x, y, size, size))
+        pygame.draw.rect(screen, colors.BLACK, (x, y, size, size), 1)
+
+
+class Loot:
+    def __init__(self, cell_size=128):
+        self.pickups = []
+        self.taken = bytearray()  # 1 for pickups somebody already grabbed, indexed by pid
+        self.index = SpatialHash(cell_size)
+
+    def add(self, weapon_id, x, y):
+        pickup = Pickup(len(self.pickups), weapon_id, x, y)
+        self.pickups.append(pickup)
+        self.taken.append(0)
+        self.index.insert(pickup, pickup.rect)
+        return pickup
+
+    def clear(self):
+        self.pickups.clear()
+        self.taken.clear()
+        self.index.clear()
+
+    def take(self, pickup):
+        self.taken[pickup.pid] = 1
+
+    def spawn_around_buildings(self, buildings, building_index, per_building=3):
+        """Scatter pickups just outside each building, skipping spots inside walls"""
+        weapon_ids = range(PISTOL + 1, len(WEAPONS))
+        world = pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT)
+        for building in buildings:
+            # buildings near the edge would drop pickups nobody can reach
+            area = building.rect.inflate(120, 120).clip(world)
+            if area.width < PICKUP_SIZE or area.height < PICKUP_SIZE:
+                continue
+            for _ in range(per_building):
+                for attempt in range(10):
+                    x = random.randint(area.left, area.right - PICKUP_SIZE)
+                    y = random.randint(area.top, area.bottom - PICKUP_SIZE)
+                    rect = pygame.Rect(x, y, PICKUP_SIZE, PICKUP_SIZE)
+                    if not any(b.collides_with(rect) for b in building_index.query(rect)):
+                        self.add(random.choice(weapon_ids), x, y)
+                        break
+
+    """
+    :QUERIES
+    """
+
+    def touching(self, rect):
+        taken = self.taken
+        return [p for p in self.index.query(rect) if not taken[p.pid] and rect.colliderect(p.rect)]
+
+    def nearest(self, x, y, max_dist, better_than=-1):
+        """Closest untaken pickup within max_dist whose weapon id is above better_than. Searches the
+        grid in rings around (x, y) and stops once no closer cell is left"""
+        taken = self.taken
+        index = self.index
+        cs = index.cell_size
+        cells = index.cells
+        cx, cy = int(x) // cs, int(y) // cs
+        best = None
+        best_d2 = max_dist * max_dist
+
+        for ring in range(int(max_dist // cs) + 2):
+            # every cell in this ring is at least (ring - 1) cells away
+            reach = (ring - 1) * cs
+            if reach > 0 and reach * reach > best_d2:
+                break
+            for gy in range(cy - ring, cy + ring + 1):
+                edge = gy == cy - ring or gy == cy + ring
+                step = 1 if edge else 2 * ring
+                for gx in range(cx - ring, cx + ring + 1, max(1, step)):
+                    bucket = cells.get((gx, gy))
+                    if bucket is None:
+                        continue
+                    for p in bucket:
+                        if taken[p.pid] or p.weapon_id <= better_than:
+                            continue
+                        dx = p.rect.centerx - x
+                        dy = p.rect.centery - y
+                        d2 = dx * dx + dy * dy
+                        if d2 < best_d2:
+                            best_d2 = d2
+                            best = p
+        return best
@@ -1,8 +1,10 @@
 import pygame
 import sys
+import time
 import game
 
 from game import game_state
+from pipeline import Pipeline
 from globals import FPS
 
 
@@ -10,21 +12,48 @@ from globals import FPS
 pygame.init()
 clock = pygame.time.Clock()
 
+def arg_value(flag):
+    """The value after a command line flag, None if the flag isn't there"""
+    if flag not in sys.argv:
+        return None
+    index = sys.argv.index(flag) + 1
+    if index >= len(sys.argv):
+        sys.exit(f"{flag} needs a value")
+    return sys.argv[index]
+
 def setup():
-    game.create_buildings()
-    game.spawn_players()
+    # let worker processes decide for the bots with: python main.py --ai-workers 4
+    # started first so the workers are forked before the telemetry writer and simulation threads
+    # start, SDL is already up but the workers never touch pygame
+    if arg_value("--ai-workers") is not None:
+        game.start_ai_workers(int(arg_value("--ai-workers")))
+    # record match telemetry with: python main.py --telemetry match.tlm
+    if arg_value("--telemetry") is not None:
+        game.start_telemetry(arg_value("--telemetry"))
+    # play a known (cached) map with: python main.py --seed 1234
+    seed = None
+    if arg_value("--seed") is not None:
+        seed = int(arg_value("--seed"))
+    game.create_buildings(seed)
+    game.spawn_loot()
+    # watch a bot only match with: python main.py --spectate
+    game.spawn_players(human="--spectate" not in sys.argv)
     
-def update_game():
-    keys = pygame.key.get_pressed()
+def update_game(keys=None, aim=None):
+    if keys is None:
+        keys = pygame.key.get_pressed()
     
     if keys[pygame.K_ESCAPE]: # handle esc key closing game
         return False 
     
     game.update_kill_circle()    
-    game.update_players(keys)
+    game.update_players(keys, aim)
     game.update_projectiles()
+    game.update_animations()
+    game.update_effects()
 
     game.expired_entity_cleanup()
+    game_state.tick += 1
     return True  # Continue the game
 
 def draw_frame():
@@ -32,29 +61,82 @@ def draw_frame():
     game.draw_ground()
     game.draw_debug()
     game.draw_buildings()
+    game.draw_loot()
     game.draw_kill_circle()
     game.draw_camera_offset_entities()
 
-    pygame.display.flip()
+    game.present_frame()
+
+def simulation_step(inputs):
+    """One tick on the simulation thread in pipelined mode, inputs are (keys, aim, tick of the frame
+    the player was looking at) from the main thread"""
+    keys, aim, seen_tick = inputs
+    if seen_tick >= 0 and game_state.human_player in game_state.players:
+        # the player aimed at an older frame, their shots get checked against where everyone was then
+        game_state.human_player.input_lag = game_state.tick - seen_tick
+    return len(game_state.players) > 1 and update_game(keys, aim)
 
 def main():
     setup()
     running = True
     game_over = False
+
+    # update and draw on separate threads with: python main.py --pipelined
+    pipeline = None
+    last_tick = -1
+    if "--pipelined" in sys.argv:
+        pipeline = Pipeline(simulation_step, game.fill_render_snapshot, FPS)
+        pipeline.start((pygame.key.get_pressed(), game.read_aim(), -1))
     
     while running:
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F11:
+                game.toggle_fullscreen()
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_2, pygame.K_3, pygame.K_4):
+                # number of spectator viewports
+                game.set_spectator_views(event.key - pygame.K_0)
+
+        if pipeline is not None:
+            # input is read here and handed over, the simulation thread picks it up next tick
+            keys = pygame.key.get_pressed()
+            if keys[pygame.K_ESCAPE]:
+                running = False
+                break
+            pipeline.set_inputs((keys, game.read_aim(), last_tick))
+
+            if pipeline.running:
+                # draw the newest tick, nothing new means nothing to redraw
+                snapshot = pipeline.acquire()
+                if snapshot is not None and snapshot.tick != last_tick:
+                    last_tick = snapshot.tick
+                    frame_start = time.perf_counter()
+                    game.draw_render_snapshot(snapshot)
+                    pipeline.release()
+                    game.present_frame()
+                    game.record_frame_time((time.perf_counter() - frame_start) * 1000)
+                elif snapshot is not None:
+                    pipeline.release()
+            elif not game_over:
+                game_over = True
+                pipeline.stop()
+                game.draw_winner()
         
         # Update game state if there are still players
-        if len(game_state.players) > 1 and not game_over:
+        elif len(game_state.players) > 1 and not game_over:
+            frame_start = time.perf_counter()
             result = update_game()
             if not result:  # Check if ESC was pressed
                 running = False
                 break
-            draw_frame()
+            if game.spectating():
+                game.draw_spectator()
+            else:
+                draw_frame()
+            # work time only, the clock.tick sleep below doesn't count
+            game.record_frame_time((time.perf_counter() - frame_start) * 1000)
         elif not game_over:
             game_over = True
             game.draw_winner()
@@ -62,6 +144,10 @@ def main():
         # Cap the frame rate
         clock.tick(FPS)
     
+    if pipeline is not None:
+        pipeline.stop()
+    game.stop_telemetry()
+    game.stop_ai_workers()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,152 @@
+"""
+Generated maps saved to disk. A map file holds the building layout, the whole world's collision
+bitmap packed 8 pixels to a byte and a coarse nav/occupancy grid. Files are keyed by seed and world
+parameters and get memory mapped on load, so known maps skip generation and mask building entirely
+
+File layout (little endian):
+    header      magic, version, nav cell size, seed, world width, world height, requested buildings, placed buildings
+    layout      placed x (x i32, y i32, building type u16, rotation u16)
+    collision   world height rows of ceil(world width / 8) bytes, bit x % 8 of byte x // 8 is pixel x
+    nav         grid height rows of grid width bytes, 1 where the cell has any wall in it
+"""
+
+import os
+import random
+import struct
+
+import numpy as np
+import pygame
+
+import buildings
+
+MAP_CACHE_DIR = "map_cache"
+NAV_CELL_SIZE = 32
+
+_MAGIC = b"JMAP"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHqIIII")
+_LAYOUT_DTYPE = np.dtype([("x", "<i4"), ("y", "<i4"), ("type", "<u2"), ("rotation", "<u2")])
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+class MapData:
+    def __init__(self, seed, width, height, building_cnt, layout, collision, nav, cell_size=NAV_CELL_SIZE):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.building_cnt = building_cnt
+        self.layout = layout  # structured array of building placements
+        self.collision = collision  # (height, ceil(width / 8)) packed bits
+        self.nav = nav  # (grid height, grid width), 1 = blocked
+        self.cell_size = cell_size
+
+    def create_buildings(self):
+        return [buildings.Buildings(int(b["x"]), int(b["y"]), int(b["type"]), int(b["rotation"]))
+                for b in self.layout]
+
+    def rect_blocked(self, rect):
+        """True if any wall pixel is inside rect, anything outside the world counts as open"""
+        x0, y0 = max(0, rect.left), max(0, rect.top)
+        x1, y1 = min(self.width, rect.right), min(self.height, rect.bottom)
+        if x0 >= x1 or y0 >= y1:
+            return False
+
+        # open nav cells have no wall pixels at all, most spawn checks stop here
+        cs = self.cell_size
+        if not self.nav[y0 // cs:(y1 - 1) // cs + 1, x0 // cs:(x1 - 1) // cs + 1].any():
+            return False
+
+        block = self.collision[y0:y1, x0 >> 3:((x1 - 1) >> 3) + 1]
+        if not block.any():
+            return False
+        bits = np.unpackbits(block, axis=1, bitorder="little")
+        start = x0 & 7
+        return bool(bits[:, start:start + (x1 - x0)].any())
+
+
+"""
+:GENERATION
+"""
+
+
+def _map_path(seed, width, height, building_cnt, cache_dir):
+    return os.path.join(cache_dir, f"{seed}_{width}x{height}_{building_cnt}.map")
+
+
+def generate(seed, width, height, building_cnt):
+    """Lay out buildings for a seed and work out the collision data, all in memory"""
+    placements = buildings.generate_layout(width, height, building_cnt, random.Random(seed))
+    layout = np.array(placements, dtype=_LAYOUT_DTYPE)
+
+    # stamp every building's wall pixels into one world sized bitmap, same threshold as mask.from_surface
+    solid = np.zeros((height, width), dtype=bool)
+    for building in [buildings.Buildings(*placement) for placement in placements]:
+        walls = pygame.surfarray.array_alpha(building.wall_sprite).T > 127
+        rect = building.rect.clip(pygame.Rect(0, 0, width, height))
+        if not rect.width or not rect.height:
+            continue
+        sx, sy = rect.x - building.rect.x, rect.y - building.rect.y
+        solid[rect.top:rect.bottom, rect.left:rect.right] |= walls[sy:sy + rect.height, sx:sx + rect.width]
+
+    collision = np.packbits(solid, axis=1, bitorder="little")
+
+    # coarse occupancy, a cell is blocked if any wall pixel falls in it
+    cs = NAV_CELL_SIZE
+    grid_w, grid_h = -(-width // cs), -(-height // cs)
+    padded = np.zeros((grid_h * cs, grid_w * cs), dtype=bool)
+    padded[:height, :width] = solid
+    nav = padded.reshape(grid_h, cs, grid_w, cs).any(axis=(1, 3)).astype(np.uint8)
+
+    return MapData(seed, width, height, building_cnt, layout, collision, nav)
+
+
+def save(game_map, path):
+    """Write a map file, through a temp file so a half written map is never picked up"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, game_map.cell_size, game_map.seed, game_map.width,
+                             game_map.height, game_map.building_cnt, len(game_map.layout)))
+        for section in (game_map.layout, game_map.collision, game_map.nav):
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            f.write(np.ascontiguousarray(section).tobytes())
+    os.replace(tmp_path, path)
+
+
+def load(path, seed, width, height, building_cnt):
+    """Memory map a map file, None if it's missing or was made for different parameters"""
+    try:
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+    except (OSError, ValueError):
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, cell_size, f_seed, f_width, f_height, f_cnt, placed = _HEADER.unpack(data[:_HEADER.size].tobytes())
+    if (magic, version, f_seed, f_width, f_height, f_cnt) != (_MAGIC, _VERSION, seed, width, height, building_cnt):
+        return None
+
+    row_bytes = -(-width // 8)
+    grid_w, grid_h = -(-width // cell_size), -(-height // cell_size)
+    layout_offset = _align(_HEADER.size)
+    collision_offset = _align(layout_offset + placed * _LAYOUT_DTYPE.itemsize)
+    nav_offset = _align(collision_offset + height * row_bytes)
+    if len(data) < nav_offset + grid_w * grid_h:
+        return None  # truncated
+
+    layout = np.frombuffer(data, dtype=_LAYOUT_DTYPE, count=placed, offset=layout_offset)
+    collision = data[collision_offset:collision_offset + height * row_bytes].reshape(height, row_bytes)
+    nav = data[nav_offset:nav_offset + grid_w * grid_h].reshape(grid_h, grid_w)
+
+    return MapData(seed, width, height, building_cnt, layout, collision, nav, cell_size)
+
+
+def load_or_generate(seed, width, height, building_cnt, cache_dir=MAP_CACHE_DIR):
+    path = _map_path(seed, width, height, building_cnt, cache_dir)
+    game_map = load(path, seed, width, height, building_cnt)
+    if game_map is None:
+        save(generate(seed, width, height, building_cnt), path)
+        game_map = load(path, seed, width, height, building_cnt)
+    return game_map
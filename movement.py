@@ -0,0 +1,95 @@
+"""
+One kinematic mover for every player. Humans (keys), bots (AI) and the training env all just set a
+movement intent in the entity columns, move_players then integrates everyone in a single pass and
+resolves walls and other players axis by axis using the spatial indexes as a broadphase
+"""
+
+import math
+import pygame
+
+from player import Player
+
+# players were indexed at the end of last tick and can have moved up to a tick's worth since,
+# so broadphase queries reach this far past the rect being tested
+_REACH = math.ceil(Player.sprint_max_speed) * 2 + 1
+
+
+def _blocked(test, eid, building_index, player_index, query):
+    """True if test overlaps a building's collision mask or another player's rect"""
+    query.update(test.x - _REACH, test.y - _REACH, test.width + _REACH * 2, test.height + _REACH * 2)
+    for building in building_index.query(test):
+        if building.collides_with(test):
+            return True
+    for player in player_index.query(query):
+        if player.eid != eid and test.colliderect(player.rect):
+            return True
+    return False
+
+
+def move_players(state):
+    """Apply this tick's movement intents for all players and write the new positions back"""
+    store = state.entities
+    xs, ys, vxs, vys, rects = store.x, store.y, store.vx, store.vy, store.rect
+    move_x, move_y, sprint, alive = store.move_x, store.move_y, store.sprint, store.alive
+    building_index = state.building_index
+    player_index = state.player_index
+
+    acceleration = Player.acceleration
+    deceleration = Player.deceleration
+    test = pygame.Rect(0, 0, Player.width, Player.height)  # reused for every collision test
+    query = pygame.Rect(test)
+
+    for eid in range(len(alive)):
+        if not alive[eid]:
+            continue
+        vx, vy = vxs[eid], vys[eid]
+        ix, iy = move_x[eid], move_y[eid]
+        max_speed = Player.sprint_max_speed if sprint[eid] else Player.max_speed
+
+        # accelerate along axes with intent, decelerate the rest
+        if iy:
+            vy += iy * acceleration
+        elif vy > 0:
+            vy = max(0, vy - deceleration)
+        elif vy < 0:
+            vy = min(0, vy + deceleration)
+
+        if ix:
+            vx += ix * acceleration
+        elif vx > 0:
+            vx = max(0, vx - deceleration)
+        elif vx < 0:
+            vx = min(0, vx + deceleration)
+
+        # Limit velocity to max speed
+        speed = math.hypot(vx, vy)
+        if speed > max_speed:
+            vx *= max_speed / speed
+            vy *= max_speed / speed
+
+        x, y = xs[eid], ys[eid]
+
+        # X axis first, stop X velocity on collision
+        if vx:
+            test.update(x + vx, y, Player.width, Player.height)
+            if _blocked(test, eid, building_index, player_index, query):
+                vx = 0
+            else:
+                x += vx
+
+        # then Y from wherever X ended up
+        if vy:
+            test.update(x, y + vy, Player.width, Player.height)
+            if _blocked(test, eid, building_index, player_index, query):
+                vy = 0
+            else:
+                y += vy
+
+        xs[eid], ys[eid] = x, y
+        vxs[eid], vys[eid] = vx, vy
+        rects[eid].topleft = (x, y)
+
+        # intents only last a tick
+        move_x[eid] = 0
+        move_y[eid] = 0
+        sprint[eid] = 0
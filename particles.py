@@ -0,0 +1,135 @@
+"""
+Particle effects (hits, muzzle flashes, deaths) kept in fixed size numpy arrays. Emitting writes into a
+ring so the oldest particles get recycled under heavy combat, integration and fading are whole array
+operations and drawing is a single blits call, so the per frame cost is capped by the capacity
+"""
+
+import numpy as np
+import pygame
+
+_ALPHA_LEVELS = 8  # particles fade in steps, each step is a cached surface
+
+
+class ParticleSystem:
+    def __init__(self, capacity=2048, drag=0.9):
+        self.capacity = capacity
+        self.drag = drag
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)  # ticks left, <= 0 is a free slot
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.style = np.zeros(capacity, dtype=np.int16)  # index into self.styles
+        self.cursor = 0
+
+        # own generator so effects never touch the simulation's random state
+        self.rng = np.random.default_rng()
+        self.styles = []  # (color, size)
+        self._style_ids = {}
+        self._surfaces = {}  # (style, alpha level, scale) -> Surface
+
+    def _style(self, color, size):
+        key = (tuple(color), size)
+        style = self._style_ids.get(key)
+        if style is None:
+            style = len(self.styles)
+            self.styles.append(key)
+            self._style_ids[key] = style
+        return style
+
+    def emit(self, x, y, count, color, speed=3.0, life=20, size=3, direction=None, spread=360):
+        """Spray count particles from (x, y). direction is an angle in degrees, spread is the cone width"""
+        idx = (self.cursor + np.arange(count)) % self.capacity
+        self.cursor = (self.cursor + count) % self.capacity
+
+        base = 0.0 if direction is None else direction
+        angles = np.radians(base + self.rng.uniform(-spread / 2, spread / 2, count))
+        speeds = speed * self.rng.uniform(0.4, 1.0, count)
+        self.pos[idx, 0] = x
+        self.pos[idx, 1] = y
+        self.vel[idx, 0] = np.cos(angles) * speeds
+        self.vel[idx, 1] = np.sin(angles) * speeds
+        lifetimes = life * self.rng.uniform(0.6, 1.0, count)
+        self.life[idx] = lifetimes
+        self.max_life[idx] = lifetimes
+        self.style[idx] = self._style(color, size)
+
+    """
+    :PRESETS
+    """
+
+    def emit_hit(self, x, y, direction):
+        self.emit(x, y, 10, (200, 20, 20), speed=3, life=18, size=3, direction=direction, spread=90)
+
+    def emit_wall_hit(self, x, y, direction):
+        self.emit(x, y, 6, (120, 110, 100), speed=2, life=14, size=2, direction=direction + 180, spread=120)
+
+    def emit_muzzle(self, x, y, direction):
+        self.emit(x, y, 4, (255, 210, 80), speed=2.5, life=6, size=2, direction=direction, spread=40)
+
+    def emit_death(self, x, y, color):
+        self.emit(x, y, 40, color, speed=4, life=40, size=4)
+        self.emit(x, y, 20, (150, 0, 0), speed=2, life=50, size=3)
+
+    """
+    :UPDATE/DRAW
+    """
+
+    def update(self):
+        live = self.life > 0
+        self.pos[live] += self.vel[live]
+        self.vel[live] *= self.drag
+        self.life[live] -= 1
+
+    def clear(self):
+        self.life[:] = 0
+
+    def mirror(self):
+        """A system with its own arrays for copy_to to fill, so it can be drawn from another thread
+        while this one keeps updating. Shares the styles and surface caches"""
+        mirror = object.__new__(ParticleSystem)
+        mirror.__dict__.update(self.__dict__)
+        mirror.pos = self.pos.copy()
+        mirror.life = self.life.copy()
+        mirror.max_life = self.max_life.copy()
+        mirror.style = self.style.copy()
+        return mirror
+
+    def copy_to(self, mirror):
+        """Copy what draw needs into a mirror() of this system, no allocation"""
+        np.copyto(mirror.pos, self.pos)
+        np.copyto(mirror.life, self.life)
+        np.copyto(mirror.max_life, self.max_life)
+        np.copyto(mirror.style, self.style)
+
+    def _surface(self, style, level, scale):
+        key = (style, level, scale)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            color, size = self.styles[style]
+            size = max(1, int(size * scale))
+            surface = pygame.Surface((size, size))
+            surface.fill(color)
+            surface.set_alpha(int(255 * (level + 1) / _ALPHA_LEVELS))
+            self._surfaces[key] = surface
+        return surface
+
+    def draw(self, screen, camera):
+        view = camera.rect
+        x = self.pos[:, 0]
+        y = self.pos[:, 1]
+        on_screen = ((self.life > 0) & (x >= view.left) & (x < view.right)
+                     & (y >= view.top) & (y < view.bottom))
+        idx = np.flatnonzero(on_screen)
+        if not len(idx):
+            return
+
+        scale = camera.scale
+        sx = ((x[idx] - view.x) * scale).astype(np.int32)
+        sy = ((y[idx] - view.y) * scale).astype(np.int32)
+        levels = np.minimum((self.life[idx] / self.max_life[idx] * _ALPHA_LEVELS).astype(np.int32), _ALPHA_LEVELS - 1)
+        styles = self.style[idx]
+
+        surface = self._surface
+        screen.blits([(surface(s, l, scale), (px, py))
+                      for s, l, px, py in zip(styles.tolist(), levels.tolist(), sx.tolist(), sy.tolist())],
+                     doreturn=False)
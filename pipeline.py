@@ -0,0 +1,195 @@
+"""
+Pipelined mode (python main.py --pipelined). The simulation runs on its own thread at the fixed tick
+rate and after every tick fills one of two preallocated RenderSnapshot buffers with what's on screen,
+then publishes it. The main thread keeps handling events and draws the published buffer while the
+next tick gets simulated into the other one, so a slow draw doesn't hold up the simulation and a slow
+tick doesn't hold up drawing. Buffers are reused tick after tick, nothing gets allocated per snapshot
+unless the number of players or projectiles grows past what a buffer has held before. The one catch
+of double buffering: if drawing a buffer takes longer than a whole tick, the simulation waits for it
+"""
+
+import threading
+import time
+
+
+class RenderSnapshot:
+    """One of the two buffers, everything the renderer needs for a tick as plain values.
+    Player and projectile columns only mean anything up to player_count / projectile_count"""
+
+    def __init__(self):
+        self.tick = -1
+
+        # players, same values Player.draw uses
+        self.player_count = 0
+        self.frames = []
+        self.center_x = []
+        self.center_y = []
+        self.x = []
+        self.y = []
+        self.rotation = []
+        self.health = []
+
+        # projectiles, same values Projectile.draw uses
+        self.projectile_count = 0
+        self.proj_center_x = []
+        self.proj_center_y = []
+        self.proj_width = []
+        self.proj_height = []
+        self.proj_rotation = []
+
+        self.loot_taken = bytearray()
+        self.safe_area = None  # Rect, updated in place
+        self.effects = None  # ParticleSystem mirror, allocated once then copied into
+        self.has_focus = False
+        self.focus_x = 0
+        self.focus_y = 0
+
+    @staticmethod
+    def _fit(columns, count):
+        # grow only, the spare tail just gets ignored
+        missing = count - len(columns[0])
+        if missing > 0:
+            for column in columns:
+                column.extend([None] * missing)
+
+    def fill(self, state):
+        self.tick = state.tick
+
+        players = state.players
+        columns = (self.frames, self.center_x, self.center_y, self.x, self.y, self.rotation, self.health)
+        self._fit(columns, len(players))
+        frames, center_x, center_y, xs, ys, rotation, health = columns
+        for i, p in enumerate(players):
+            frames[i] = p.animator.frame
+            center_x[i] = p.rect.centerx
+            center_y[i] = p.rect.centery
+            xs[i] = p.x
+            ys[i] = p.y
+            rotation[i] = p.rotation
+            health[i] = p.health
+        self.player_count = len(players)
+
+        projectiles = state.projectiles
+        columns = (self.proj_center_x, self.proj_center_y, self.proj_width, self.proj_height, self.proj_rotation)
+        self._fit(columns, len(projectiles))
+        center_x, center_y, width, height, rotation = columns
+        for i, p in enumerate(projectiles):
+            center_x[i] = p.rect.centerx
+            center_y[i] = p.rect.centery
+            width[i] = p.rect.width
+            height[i] = p.rect.height
+            rotation[i] = p.rotation
+        self.projectile_count = len(projectiles)
+
+        taken = state.loot.taken
+        if len(self.loot_taken) != len(taken):
+            self.loot_taken = bytearray(len(taken))
+        self.loot_taken[:] = taken
+
+        if self.safe_area is None:
+            self.safe_area = state.kill_circle.safe_area.copy()
+        else:
+            self.safe_area.update(state.kill_circle.safe_area)
+
+        if state.effects is not None:
+            if self.effects is None:
+                self.effects = state.effects.mirror()
+            state.effects.copy_to(self.effects)
+
+        # camera follows the human, or whoever has the most health once they're dead
+        focus = None
+        if state.human_player in players:
+            focus = state.human_player
+        elif players:
+            focus = max(players, key=lambda p: (p.health, -p.eid))
+        self.has_focus = focus is not None
+        if focus is not None:
+            self.focus_x, self.focus_y = focus.rect.centerx, focus.rect.centery
+
+
+class Pipeline:
+    def __init__(self, step, fill, tick_rate):
+        """step(inputs) runs one tick and returns False once the match is over,
+        fill(snapshot) then writes that tick into a RenderSnapshot buffer"""
+        self._step = step
+        self._fill = fill
+        self._tick_time = 1 / tick_rate
+        self._inputs = None  # latest input from the main thread
+
+        self._buffers = (RenderSnapshot(), RenderSnapshot())
+        self._published = -1  # buffer holding the newest finished tick, -1 before the first one
+        self._reading = -1  # buffer the renderer is drawing from, -1 for none
+        self._swap = threading.Condition()
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self.running = False
+        self.error = None  # whatever killed the simulation thread, re-raised by stop()
+
+    def start(self, inputs):
+        self._inputs = inputs
+        self.running = True
+        self._thread.start()
+
+    def set_inputs(self, inputs):
+        self._inputs = inputs
+
+    """
+    :RENDER THREAD
+    """
+
+    def acquire(self):
+        """The newest published buffer, held until release(). None before the first tick"""
+        with self._swap:
+            if self._published < 0:
+                return None
+            self._reading = self._published
+            return self._buffers[self._reading]
+
+    def release(self):
+        with self._swap:
+            self._reading = -1
+            self._swap.notify()
+
+    def stop(self):
+        self._stop.set()
+        with self._swap:
+            self._swap.notify()
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    """
+    :SIMULATION THREAD
+    """
+
+    def _back_buffer(self):
+        """Index of the buffer that isn't published, once the renderer has let go of it"""
+        with self._swap:
+            back = 1 if self._published == 0 else 0
+            while self._reading == back and not self._stop.is_set():
+                self._swap.wait(0.1)
+            return back
+
+    def _run(self):
+        next_tick = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                if not self._step(self._inputs):
+                    break
+
+                back = self._back_buffer()
+                self._fill(self._buffers[back])
+                with self._swap:
+                    self._published = back
+
+                next_tick += self._tick_time
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    self._stop.wait(delay)
+                else:  # behind, carry on from now instead of rushing ticks to catch up
+                    next_tick = time.perf_counter()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.running = False
@@ -1,195 +1,220 @@
 import pygame
 import random
 import math
+import ai
+import animated_sprite
+import utils
+from weapons import WEAPONS
+from animated_sprite import SpriteAnimation, Animator
 # from camera import Camera
 
+def load_animations():
+    """Register the player animations once, every player shares the sliced frames"""
+    if animated_sprite.get_animation("player_idle") is not None:
+        return
+    # TODO: res/player.png is a single 64x51 frame, walk is just idle until real walk frames get drawn
+    SpriteAnimation("player_idle", "res/player.png", 1, 64, 51, size=(32, 32))
+    SpriteAnimation("player_walk", "res/player.png", 1, 64, 51, frame_duration=.1, size=(32, 32))
+
+"""
+:DRAW
+"""
+
+# plain values in so render snapshots (pipeline.py) can draw players and projectiles without the objects
+
+
+def draw_player(screen, camera, frame, center_x, center_y, x, y, rotation, health):
+    # Get camera-adjusted position
+    center_x, center_y = camera.world_to_screen_pos(center_x, center_y)
+
+    # Rotate the sprite to face the aiming direction, shared between cameras
+    rotated_sprite = utils.rotated_sprite(frame, -rotation, camera.scale)
+
+    # Draw the rotated sprite centered on the player
+    screen.blit(rotated_sprite, (center_x - rotated_sprite.get_width() // 2,
+                                 center_y - rotated_sprite.get_height() // 2))
+
+    # Draw health bar with camera offset
+    health_width = 30 * (health / 100) * camera.scale
+    health_bar_pos = camera.world_to_screen_pos(x + 1, y - 10)
+    bar_width, bar_height = 30 * camera.scale, max(1, 5 * camera.scale)
+    pygame.draw.rect(screen, (255, 0, 0), (health_bar_pos[0], health_bar_pos[1], bar_width, bar_height))
+    pygame.draw.rect(screen, (0, 255, 0), (health_bar_pos[0], health_bar_pos[1], health_width, bar_height))
+
+
+def draw_projectile(screen, camera, center_x, center_y, width, height, rotation):
+    # Get camera-adjusted position
+    center_x, center_y = camera.world_to_screen_pos(center_x, center_y)
+
+    # Create a surface for the projectile
+    size = (max(1, int(width * camera.scale)), max(1, int(height * camera.scale)))
+    projectile_surface = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.rect(projectile_surface, (0, 0, 0), (0, 0) + size)
+
+    # Rotate the surface
+    rotated_surface = pygame.transform.rotate(projectile_surface, -rotation)
+
+    # Draw the rotated projectile centered at the camera-adjusted position
+    screen.blit(rotated_surface, (center_x - rotated_surface.get_width() // 2,
+                                  center_y - rotated_surface.get_height() // 2))
+
+
 class Player:
-    def __init__(self, x, y, is_human=False):
-        # render stuff
-        self.pos = pygame.Vector2(x, y)
-        self.width = 32
-        self.height = 32
-        self.rect = pygame.Rect(self.pos.x, self.pos.y, self.width, self.height)
+    """Handle to a player in an EntityStore, position, velocity, health and timers live in the store's columns"""
+    __slots__ = ("store", "eid", "color", "is_human", "animator", "input_lag")
+
+    # render stuff
+    width = 32
+    height = 32
+
+    # movement
+    max_speed = 2.5
+    sprint_max_speed = 5
+    acceleration = 0.15
+    deceleration = 0.08
+    rotation_offset = -10
+
+    # shooting
+    shoot_position_offset = pygame.Vector2(0, 0)
+
+    # AI players
+    view_range = 400  # AI can only see players within this range
+    preferred_distance = 150  # AI will try to keep this distance from other players
+
+    def __init__(self, store, x, y, is_human=False):
+        self.store = store
+        self.eid = store.spawn(x, y, width=self.width, height=self.height)
         self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
-        self.sprite = pygame.image.load("res/player.png").convert_alpha()
-        self.sprite = pygame.transform.scale(self.sprite, (self.width, self.height))
-        
-        # stats
-        self.health = 100
-        self.bullet_speed = 13
         self.is_human = is_human
-        
-        # movement
-        self.max_speed = 2.5
-        self.sprint_max_speed = 5
-        self.acceleration = 0.15
-        self.deceleration = 0.08
-        self.velocity = pygame.Vector2(0, 0)
-        self.rotation = 0
-        self.rotation_offset = -10
-
-        # shooting
-        self.shoot_timer = 0
-        self.shoot_position_offset = pygame.Vector2(0,0)
-        
-        # AI players
-        self.view_range = 400  # AI can only see players within this range
-        self.preferred_distance = 150  # AI will try to keep this distance from other players
-
-    def find_nearest(self, others):
-        min_dist = float('inf')
-        nearest = None
-        for other in others:
-            if other != self:
-                dist = self.pos.distance_to(other.pos)
-                # Only consider players within view range for AI
-                if dist < min_dist and (self.is_human or dist <= self.view_range):
-                    min_dist = dist
-                    nearest = other
-        return nearest
-
-    def move_towards(self, target, world_objects, players):
-        direction = target.pos - self.pos
-        if direction.length() > 0:
-            direction.normalize_ip()
-            
-            # Apply acceleration towards target
-            self.velocity += direction * self.acceleration
-            
-            # Limit velocity to max speed
-            if self.velocity.length() > self.max_speed:
-                self.velocity.scale_to_length(self.max_speed)
-            
-            # Calculate new position
-            new_pos = self.pos + self.velocity
-            
-            # Check for collisions with world objects
-            new_rect_x = pygame.Rect(new_pos.x, self.pos.y, self.width, self.height)
-            new_rect_y = pygame.Rect(self.pos.x, new_pos.y, self.width, self.height)
-            
-            # Move in X direction if no collision
-            x_collision = False
-            for obj in world_objects:
-                if obj.collides_with(new_rect_x):
-                    x_collision = True
-                    self.velocity.x = 0  # Stop X velocity on collision
-                    break
-            
-            # Check collision with other players in X direction
-            for player in players:
-                if player != self and new_rect_x.colliderect(player.rect):
-                    x_collision = True
-                    self.velocity.x = 0  # Stop X velocity on collision
-                    break
-            
-            if not x_collision:
-                self.pos.x = new_pos.x
-            
-            # Move in Y direction if no collision
-            y_collision = False
-            for obj in world_objects:
-                if obj.collides_with(new_rect_y):
-                    y_collision = True
-                    self.velocity.y = 0  # Stop Y velocity on collision
-                    break
-            
-            # Check collision with other players in Y direction
-            for player in players:
-                if player != self and new_rect_y.colliderect(player.rect):
-                    y_collision = True
-                    self.velocity.y = 0  # Stop Y velocity on collision
-                    break
-            
-            if not y_collision:
-                self.pos.y = new_pos.y
-            
-            # Update rect position
-            self.rect.topleft = (self.pos.x, self.pos.y)
+        self.input_lag = 0  # ticks late this player's input arrives (remote or replayed controls)
+        load_animations()
+        self.animator = Animator("player_idle")
+
+    """
+    :COMPONENT ACCESS
+    """
+
+    @property
+    def x(self):
+        return self.store.x[self.eid]
+
+    @x.setter
+    def x(self, value):
+        self.store.x[self.eid] = value
+        self.store.rect[self.eid].x = value
+
+    @property
+    def y(self):
+        return self.store.y[self.eid]
+
+    @y.setter
+    def y(self, value):
+        self.store.y[self.eid] = value
+        self.store.rect[self.eid].y = value
+
+    @property
+    def rect(self):
+        # the store's rect, moves with x/y
+        return self.store.rect[self.eid]
+
+    @property
+    def vx(self):
+        return self.store.vx[self.eid]
+
+    @vx.setter
+    def vx(self, value):
+        self.store.vx[self.eid] = value
+
+    @property
+    def vy(self):
+        return self.store.vy[self.eid]
+
+    @vy.setter
+    def vy(self, value):
+        self.store.vy[self.eid] = value
+
+    @property
+    def pos(self):
+        # a copy, write through x/y or assign a whole new vector
+        return pygame.Vector2(self.store.x[self.eid], self.store.y[self.eid])
+
+    @pos.setter
+    def pos(self, value):
+        self.store.move(self.eid, value[0], value[1])
+
+    @property
+    def velocity(self):
+        return pygame.Vector2(self.store.vx[self.eid], self.store.vy[self.eid])
+
+    @velocity.setter
+    def velocity(self, value):
+        self.store.vx[self.eid] = value[0]
+        self.store.vy[self.eid] = value[1]
+
+    @property
+    def health(self):
+        return self.store.health[self.eid]
+
+    @health.setter
+    def health(self, value):
+        self.store.health[self.eid] = value
+
+    @property
+    def rotation(self):
+        return self.store.rotation[self.eid]
+
+    @rotation.setter
+    def rotation(self, value):
+        self.store.rotation[self.eid] = value
+
+    @property
+    def weapon(self):
+        return WEAPONS[self.store.weapon[self.eid]]
+
+    @property
+    def weapon_id(self):
+        return self.store.weapon[self.eid]
+
+    @weapon_id.setter
+    def weapon_id(self, value):
+        self.store.weapon[self.eid] = value
+
+    @property
+    def shoot_timer(self):
+        return self.store.shoot_timer[self.eid]
+
+    @shoot_timer.setter
+    def shoot_timer(self, value):
+        self.store.shoot_timer[self.eid] = value
 
-    def handle_movement(self, keys, world_objects, players):
+    """
+    :BEHAVIOUR
+    """
+
+    def move_towards(self, target):
+        """Set this tick's movement intent straight at a target, movement.move_players does the moving"""
+        dx = target.rect.x - self.store.x[self.eid]
+        dy = target.rect.y - self.store.y[self.eid]
+        length = math.hypot(dx, dy)
+        if length > 0:
+            self.move_with_input(dx / length, dy / length)
+
+    def handle_movement(self, keys):
         """Handle human player movement with WASD keys using acceleration and deceleration"""
         if not self.is_human:
             return
-        
-        # check for sprinting
-        max_speed = self.max_speed
-        if keys[pygame.K_LSHIFT]:
-            max_speed = self.sprint_max_speed
-
-        # Apply acceleration based on key presses
-        # W - move up
-        if keys[pygame.K_w]:
-            self.velocity.y -= self.acceleration
-        # S - move down
-        elif keys[pygame.K_s]:
-            self.velocity.y += self.acceleration
-        # If neither W nor S is pressed, apply deceleration in Y direction
-        else:
-            if self.velocity.y > 0:
-                self.velocity.y = max(0, self.velocity.y - self.deceleration)
-            elif self.velocity.y < 0:
-                self.velocity.y = min(0, self.velocity.y + self.deceleration)
-        
-        # A - move left
-        if keys[pygame.K_a]:
-            self.velocity.x -= self.acceleration
-        # D - move right
-        elif keys[pygame.K_d]:
-            self.velocity.x += self.acceleration
-        # If neither A nor D is pressed, apply deceleration in X direction
-        else:
-            if self.velocity.x > 0:
-                self.velocity.x = max(0, self.velocity.x - self.deceleration)
-            elif self.velocity.x < 0:
-                self.velocity.x = min(0, self.velocity.x + self.deceleration)
-        
-        # Limit velocity to max speed
-        if self.velocity.length() > max_speed:
-            self.velocity.scale_to_length(max_speed)
-        
-        # Calculate new positions based on velocity
-        new_pos = self.pos + self.velocity
-        
-        # Check for collisions with world objects in X direction
-        new_rect_x = pygame.Rect(new_pos.x, self.pos.y, self.width, self.height)
-        x_collision = False
-        for obj in world_objects:
-            if obj.collides_with(new_rect_x):
-                x_collision = True
-                self.velocity.x = 0  # Stop X velocity on collision
-                break
-        
-        # Check for collisions with other players in X direction
-        for player in players:
-            if player != self and new_rect_x.colliderect(player.rect):
-                x_collision = True
-                self.velocity.x = 0  # Stop X velocity on collision
-                break
-        
-        if not x_collision:
-            self.pos.x = new_pos.x
-        
-        # Check for collisions with world objects in Y direction
-        new_rect_y = pygame.Rect(self.pos.x, new_pos.y, self.width, self.height)
-        y_collision = False
-        for obj in world_objects:
-            if obj.collides_with(new_rect_y):
-                y_collision = True
-                self.velocity.y = 0  # Stop Y velocity on collision
-                break
-        
-        # Check for collisions with other players in Y direction
-        for player in players:
-            if player != self and new_rect_y.colliderect(player.rect):
-                y_collision = True
-                self.velocity.y = 0  # Stop Y velocity on collision
-                break
-        
-        if not y_collision:
-            self.pos.y = new_pos.y
-        
-        # Update rect position
-        self.rect.topleft = (self.pos.x, self.pos.y)
+
+        # W/S and A/D, the first key of each pair wins like before
+        move_x = -1 if keys[pygame.K_a] else 1 if keys[pygame.K_d] else 0
+        move_y = -1 if keys[pygame.K_w] else 1 if keys[pygame.K_s] else 0
+        self.move_with_input(move_x, move_y, keys[pygame.K_LSHIFT])
+
+    def move_with_input(self, move_x, move_y, sprint=False):
+        """Set this tick's movement intent, -1 to 1 per axis. Axes left at 0 decelerate"""
+        store = self.store
+        store.move_x[self.eid] = move_x
+        store.move_y[self.eid] = move_y
+        store.sprint[self.eid] = 1 if sprint else 0
     
     def handle_shooting(self, keys, mouse_pos, mouse_buttons, camera, projectiles):
         """Handle human player shooting with left mouse button"""
@@ -197,186 +222,101 @@ class Player:
             return
             
         # Convert mouse position to world coordinates
-        world_mouse_pos = pygame.Vector2(camera.screen_to_world_pos(mouse_pos[0], mouse_pos[1]))
-        
-        # Calculate direction from player to mouse
-        player_center = self.pos + pygame.Vector2(16, 16)
-        direction = world_mouse_pos - player_center
-        
-        # Update rotation angle to face mouse
-        if direction.length() > 0:
-            # Calculate angle in radians and convert to degrees
-            angle = math.atan2(direction.y, direction.x)
-            self.rotation = math.degrees(angle) + self.rotation_offset
-        
+        world_x, world_y = camera.screen_to_world_pos(mouse_pos[0], mouse_pos[1])
+
         # Handle shooting with left mouse button (button 0)
-        if mouse_buttons[0] and self.shoot_timer >= 30:
-            self.shoot_timer = 0
-            
-            # Normalize direction
-            if direction.length() > 0:
-                direction.normalize_ip()
-                
-            projectiles.append(Projectile(player_center.x + self.shoot_position_offset.x, player_center.y + self.shoot_position_offset.y, 
-                                        direction.x * self.bullet_speed, direction.y * self.bullet_speed, self))
-    
-    def move_away_from(self, target, world_objects, players):
-        """Move away from a target while avoiding obstacles"""
-        direction = self.pos - target.pos  # Direction away from target
-        if direction.length() > 0:
-            direction.normalize_ip()
-            
-            # Apply acceleration away from target
-            self.velocity += direction * self.acceleration
-            
-            # Limit velocity to max speed
-            if self.velocity.length() > self.max_speed:
-                self.velocity.scale_to_length(self.max_speed)
-            
-            # Calculate new position
-            new_pos = self.pos + self.velocity
-            
-            # Check for collisions with world objects
-            new_rect_x = pygame.Rect(new_pos.x, self.pos.y, self.width, self.height)
-            new_rect_y = pygame.Rect(self.pos.x, new_pos.y, self.width, self.height)
-            
-            # Move in X direction if no collision
-            x_collision = False
-            for obj in world_objects:
-                if obj.collides_with(new_rect_x):
-                    x_collision = True
-                    self.velocity.x = 0  # Stop X velocity on collision
-                    break
-            
-            # Check collision with other players in X direction
-            for player in players:
-                if player != self and new_rect_x.colliderect(player.rect):
-                    x_collision = True
-                    self.velocity.x = 0  # Stop X velocity on collision
-                    break
-            
-            if not x_collision:
-                self.pos.x = new_pos.x
-            
-            # Move in Y direction if no collision
-            y_collision = False
-            for obj in world_objects:
-                if obj.collides_with(new_rect_y):
-                    y_collision = True
-                    self.velocity.y = 0  # Stop Y velocity on collision
-                    break
-            
-            # Check collision with other players in Y direction
-            for player in players:
-                if player != self and new_rect_y.colliderect(player.rect):
-                    y_collision = True
-                    self.velocity.y = 0  # Stop Y velocity on collision
-                    break
-            
-            if not y_collision:
-                self.pos.y = new_pos.y
-            
-            # Update rect position
-            self.rect.topleft = (self.pos.x, self.pos.y)
+        self.aim_and_shoot(world_x, world_y, mouse_buttons[0], projectiles)
 
-    def update(self, projectiles, players, world_objects):
-        if not self.is_human:
-            self.shoot_timer += 1
-            
-            # Find nearest player
-            nearest = self.find_nearest(players)
-            
-            # Handle shooting and rotation
-            if nearest:
-                # Calculate direction to nearest player
-                player_center = self.pos + pygame.Vector2(16, 16)
-                direction = nearest.pos - player_center
-                dist = direction.length()
-                
-                # Update rotation to face the target
-                if dist > 0:
-                    angle = math.atan2(direction.y, direction.x)
-                    self.rotation = math.degrees(angle) + self.rotation_offset
-                
-                # Handle shooting
-                if self.shoot_timer >= 60:
-                    self.shoot_timer = 0
-                    if dist <= self.view_range:  # Only shoot if within view range
-                        if direction.length() > 0:
-                            direction.normalize_ip()
-                        projectiles.append(Projectile(player_center.x + self.shoot_position_offset.x, 
-                                                      player_center.y + self.shoot_position_offset.y, 
-                                                      direction.x * self.bullet_speed, direction.y * self.bullet_speed, self))
-            
-            # Handle movement based on distance to nearest player
-            if nearest and self.pos.distance_to(nearest.pos) <= self.view_range:
-                current_distance = self.pos.distance_to(nearest.pos)
-                
-                # If too close, move away
-                if current_distance < self.preferred_distance - 20:  # Add a small buffer
-                    self.move_away_from(nearest, world_objects, players)
-                # If too far, move closer
-                elif current_distance > self.preferred_distance + 20:  # Add a small buffer
-                    self.move_towards(nearest, world_objects, players)
-                # If at a good distance, apply deceleration to slow down
-                else:
-                    # Apply deceleration in X direction
-                    if self.velocity.x > 0:
-                        self.velocity.x = max(0, self.velocity.x - self.deceleration)
-                    elif self.velocity.x < 0:
-                        self.velocity.x = min(0, self.velocity.x + self.deceleration)
-                    
-                    # Apply deceleration in Y direction
-                    if self.velocity.y > 0:
-                        self.velocity.y = max(0, self.velocity.y - self.deceleration)
-                    elif self.velocity.y < 0:
-                        self.velocity.y = min(0, self.velocity.y + self.deceleration)
-            # Apply deceleration if no target or target out of range
+    def aim_and_shoot(self, world_x, world_y, fire, projectiles):
+        """Face a world position and fire at it if fire is set and the gun is ready"""
+        store, eid = self.store, self.eid
+
+        # Calculate direction from player center to target
+        center_x = store.x[eid] + 16
+        center_y = store.y[eid] + 16
+        dx = world_x - center_x
+        dy = world_y - center_y
+
+        # Update rotation angle to face target
+        if dx or dy:
+            store.rotation[eid] = math.degrees(math.atan2(dy, dx)) + self.rotation_offset
+
+        if fire and store.shoot_timer[eid] >= WEAPONS[store.weapon[eid]].fire_interval:
+            store.shoot_timer[eid] = 0
+            self.fire(center_x, center_y, dx, dy, projectiles)
+
+    def fire(self, x, y, dx, dy, projectiles):
+        """Spawn the projectiles for one shot of the current weapon from (x, y) along (dx, dy)"""
+        weapon = self.weapon
+        length = math.hypot(dx, dy)
+        if length > 0:
+            dx /= length
+            dy /= length
+        x += self.shoot_position_offset.x
+        y += self.shoot_position_offset.y
+        for i in range(weapon.pellets):
+            # pellets fan out evenly across the spread, no randomness so sims stay deterministic
+            if weapon.pellets > 1:
+                angle = math.radians(weapon.spread * (i / (weapon.pellets - 1) - 0.5))
+                cos, sin = math.cos(angle), math.sin(angle)
+                pellet_x, pellet_y = dx * cos - dy * sin, dx * sin + dy * cos
             else:
-                # Apply deceleration in X direction
-                if self.velocity.x > 0:
-                    self.velocity.x = max(0, self.velocity.x - self.deceleration)
-                elif self.velocity.x < 0:
-                    self.velocity.x = min(0, self.velocity.x + self.deceleration)
-                
-                # Apply deceleration in Y direction
-                if self.velocity.y > 0:
-                    self.velocity.y = max(0, self.velocity.y - self.deceleration)
-                elif self.velocity.y < 0:
-                    self.velocity.y = min(0, self.velocity.y + self.deceleration)
+                pellet_x, pellet_y = dx, dy
+            projectiles.append(Projectile(x, y, pellet_x * weapon.bullet_speed, pellet_y * weapon.bullet_speed,
+                                          self, weapon.damage, weapon.lifetime, self.input_lag))
+    
+    def act(self, target, move_x, move_y, fire, projectiles):
+        """Carry out an ai.decide decision: face the target, shoot if told to and set the movement intent"""
+        store, eid = self.store, self.eid
+        if target:
+            # Calculate direction to the target
+            center_x = store.x[eid] + 16
+            center_y = store.y[eid] + 16
+            dx = store.x[target.eid] - center_x
+            dy = store.y[target.eid] - center_y
+
+            # Update rotation to face the target
+            if dx or dy:
+                store.rotation[eid] = math.degrees(math.atan2(dy, dx)) + self.rotation_offset
+
+            # the gun was ready, it resets even when the target is out of range
+            if fire != ai.HOLD:
+                store.shoot_timer[eid] = 0
+                if fire == ai.FIRE:
+                    self.fire(center_x, center_y, dx, dy, projectiles)
+
+        # no intent means the mover slows us down
+        if move_x or move_y:
+            self.move_with_input(move_x, move_y)
+
+    def update(self):
+        # shoot timers are ticked for everyone at once by entities.tick_timers, after the human shoots
+        # and before the bots act, bots act through act()
+        # swap between walk and idle animations, replaying the current one is a no-op
+        store, eid = self.store, self.eid
+        if store.vx[eid] or store.vy[eid]:
+            self.animator.play("player_walk")
         else:
-            # Human player shoots on spacebar press, handled separately
-            self.shoot_timer += 1
+            self.animator.play("player_idle")
 
     def draw(self, screen, camera):
-        # Get camera-adjusted position
-        camera_rect = camera.apply(self.rect)
-        
-        # Rotate the sprite to face the aiming direction
-        rotated_sprite = pygame.transform.rotate(self.sprite, -self.rotation)
-        
-        # Get the rect of the rotated sprite
-        rot_rect = rotated_sprite.get_rect(center=camera_rect.center)
-        
-        # Draw the rotated sprite
-        screen.blit(rotated_sprite, rot_rect.topleft)
-        
-        # Draw health bar with camera offset
-        health_width = 30 * (self.health / 100)
-        health_bar_pos = camera.world_to_screen_pos(self.pos.x + 1, self.pos.y - 10)
-        pygame.draw.rect(screen, (255, 0, 0), (health_bar_pos[0], health_bar_pos[1], 30, 5))
-        pygame.draw.rect(screen, (0, 255, 0), (health_bar_pos[0], health_bar_pos[1], health_width, 5))
+        store, eid = self.store, self.eid
+        rect = store.rect[eid]
+        draw_player(screen, camera, self.animator.frame, rect.centerx, rect.centery,
+                    store.x[eid], store.y[eid], store.rotation[eid], store.health[eid])
 
 class Projectile:
-    def __init__(self, x, y, dx, dy, owner, dmg = 35):
+    def __init__(self, x, y, dx, dy, owner, dmg = 35, lifetime = 40, lag = 0):
         self.pos = pygame.Vector2(x, y)
         self.velocity = pygame.Vector2(dx, dy)
         self.proj_length_decay = 1
         self.rect = pygame.Rect(x, y, 30, 3)
         self.owner = owner
-        self.lifetime = 40  # Add lifetime to prevent projectiles from traveling forever
+        self.lifetime = lifetime  # Add lifetime to prevent projectiles from traveling forever
         self.mark_destroyed = False
         self.damage = dmg
+        self.age = 0  # ticks since fired
+        self.lag = lag  # hits get checked against where players were this many ticks ago
         
         # Calculate rotation angle based on velocity direction
         if self.velocity.length() > 0:
@@ -389,22 +329,10 @@ class Projectile:
         self.pos += self.velocity
         self.rect.topleft = (self.pos.x, self.pos.y)
         self.lifetime -= 1
+        self.age += 1
         if self.rect.width > 2:
             self.rect.width -= self.proj_length_decay
 
     def draw(self, screen, camera):
-        # Get camera-adjusted position
-        camera_rect = camera.apply(self.rect)
-        
-        # Create a surface for the projectile
-        projectile_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        pygame.draw.rect(projectile_surface, (0, 0, 0), (0, 0, self.rect.width, self.rect.height))
-        
-        # Rotate the surface
-        rotated_surface = pygame.transform.rotate(projectile_surface, -self.rotation)
-        
-        # Get the rect of the rotated surface centered at the camera-adjusted position
-        rotated_rect = rotated_surface.get_rect(center=camera_rect.center)
-        
-        # Draw the rotated projectile
-        screen.blit(rotated_surface, rotated_rect.topleft)
+        draw_projectile(screen, camera, self.rect.centerx, self.rect.centery,
+                        self.rect.width, self.rect.height, self.rotation)
@@ -0,0 +1,226 @@
+"""
+The simulation half of a match. Everything in here works on a GameState passed in and never
+touches the window, so the same code drives the game in game.py and headless worlds in vec_env.py
+"""
+
+import pygame
+import random
+import colors
+
+import ai
+import mapcache
+import movement
+import telemetry
+
+from player import Player
+from globals import WORLD_WIDTH, WORLD_HEIGHT
+
+"""
+:SETUP
+"""
+
+
+def create_buildings(state, building_cnt, seed=None):
+    """Build the map. A seed loads the map from (or saves it to) the on disk cache,
+    without one a fresh map is generated in memory from the random module"""
+    if seed is None:
+        state.map = mapcache.generate(random.getrandbits(32), WORLD_WIDTH, WORLD_HEIGHT, building_cnt)
+    else:
+        state.map = mapcache.load_or_generate(seed, WORLD_WIDTH, WORLD_HEIGHT, building_cnt)
+    state.buildings = state.map.create_buildings()
+    state.building_index.clear()
+    for building in state.buildings:
+        state.building_index.insert(building, building.rect)
+
+
+def spawn_loot(state, per_building=3):
+    state.loot.clear()
+    state.loot.spawn_around_buildings(state.buildings, state.building_index, per_building)
+
+
+""" Create AI players spread across the world (ensuring they don't spawn inside walls)
+Create 1 human player in the center of the world (ensuring they don't spawn inside walls), unless human is False """
+
+
+def spawn_players(state, bot_cnt=9, human=True):
+    for _ in range(bot_cnt):
+        valid_spawn = False
+        while not valid_spawn:
+            spawn_pos = pygame.Vector2(
+                random.randint(0, WORLD_WIDTH - 32),
+                random.randint(0, WORLD_HEIGHT - 32)
+            )
+            player_rect = pygame.Rect(spawn_pos.x, spawn_pos.y, 32, 32)
+            valid_spawn = not state.map.rect_blocked(player_rect)
+        state.players.append(
+            Player(state.entities, spawn_pos.x, spawn_pos.y))
+
+    if human:  # bot only matches are just for watching
+        spawn_pos = pygame.Vector2(WORLD_WIDTH // 2, WORLD_HEIGHT // 2)
+        while state.map.rect_blocked(pygame.Rect(spawn_pos.x, spawn_pos.y, 32, 32)):
+            # Try a bit to the right and down
+            spawn_pos += pygame.Vector2(50, 50)
+
+        human_player = Player(state.entities,
+                              spawn_pos.x, spawn_pos.y, is_human=True)
+        human_player.color = colors.BLUE  # Blue color for human player
+        state.human_player = human_player
+        state.players.append(human_player)
+    index_entities(state)
+
+
+"""
+:UPDATE
+"""
+
+
+def update_players(state, nearest_ids=None):
+    """Update every player then move them all, human input has to be applied before this.
+    nearest_ids optionally maps entity id -> nearest target id (-1 for none) when perception
+    was already worked out in a batch, otherwise the bots search for themselves (on the
+    state's AI worker processes if it has them)"""
+    store = state.entities
+    bot_ids = [p.eid for p in state.players if not p.is_human]
+    if state.ai_workers is not None and nearest_ids is None:
+        decisions = state.ai_workers.decide(store, bot_ids)
+    else:
+        decisions = ai.Decisions.blank(store.capacity)
+        ai.decide(store.x, store.y, store.alive, store.shoot_timer, store.weapon, bot_ids,
+                  Player.view_range, Player.preferred_distance, decisions, nearest_ids)
+
+    by_eid = {p.eid: p for p in state.players}
+    for player in state.players:
+        if not player.is_human:
+            eid = player.eid
+            target = by_eid.get(decisions.target[eid])
+            player.act(target, decisions.move_x[eid], decisions.move_y[eid], decisions.fire[eid],
+                       state.projectiles)
+
+            if not target:
+                # nobody to fight, go grab a better gun if one is in sight
+                pickup = state.loot.nearest(player.rect.centerx, player.rect.centery,
+                                            player.view_range, player.weapon_id)
+                if pickup:
+                    player.move_towards(pickup)
+        player.update()
+
+    # everyone's intent is in, move them all together
+    movement.move_players(state)
+    collect_loot(state)
+
+
+def collect_loot(state):
+    """Players pick up any better weapon they are standing on"""
+    loot = state.loot
+    for player in state.players:
+        for pickup in loot.touching(player.rect):
+            if pickup.weapon_id > player.weapon_id:
+                player.weapon_id = pickup.weapon_id
+                loot.take(pickup)
+
+
+def update_projectiles(state):
+    effects = state.effects
+    events = state.telemetry
+    # update projectiles
+    for projectile in state.projectiles[:]:
+        if projectile.age == 0:  # fired this tick
+            if effects is not None:
+                effects.emit_muzzle(projectile.pos.x, projectile.pos.y, projectile.rotation)
+            if events is not None:
+                events.record(state.tick, telemetry.SHOT, projectile.owner.eid,
+                              projectile.pos.x, projectile.pos.y, projectile.damage)
+        projectile.update()
+
+    handle_projectile_collisions(
+        state.projectiles, state.players, state.buildings, effects, events, state.tick, state.history)
+
+
+""" handle the projectile collisions, projectiles fired from late input get checked against
+where players were lag ticks ago when history has that tick """
+
+
+def handle_projectile_collisions(projectiles, players, buildings, effects=None, events=None, tick=0, history=None):
+    rewound = pygame.Rect(0, 0, 0, 0)  # reused for every rewound player rect
+    for projectile in projectiles[:]:
+        if projectile in projectiles:  # Check if projectile still exists
+            # Check collision with buildings
+            for obj in buildings:
+                if obj.collides_with(projectile.rect):
+                    if projectile in projectiles:  # Double-check before removing
+                        projectiles.remove(projectile)
+                    if effects is not None:
+                        effects.emit_wall_hit(projectile.rect.centerx, projectile.rect.centery, projectile.rotation)
+                    break
+
+            # If projectile still exists, check collision with players
+            if projectile in projectiles:
+                rewind_tick = tick - projectile.lag
+                rewind = history is not None and projectile.lag > 0 and history.has_tick(rewind_tick)
+                for player in players:
+                    if player == projectile.owner:
+                        continue
+                    target = player.rect
+                    if rewind:
+                        target = rewound
+                        rewound.size = player.rect.size
+                        if not history.rect_at(player.eid, rewind_tick, rewound):
+                            continue  # wasn't around back then
+                    if target.colliderect(projectile.rect):
+                        player.health -= projectile.damage
+                        if effects is not None:
+                            effects.emit_hit(projectile.rect.centerx, projectile.rect.centery, projectile.rotation)
+                        if events is not None:
+                            events.record(tick, telemetry.DAMAGE, player.eid, player.x, player.y, projectile.damage,
+                                          telemetry.SOURCE_PROJECTILE, projectile.owner.eid)
+                        if projectile in projectiles:  # Double-check before removing
+                            projectiles.remove(projectile)
+                        break
+
+
+def update_kill_circle(state):
+    events = state.telemetry
+    if events is None:
+        state.kill_circle.update(state.entities)
+        return
+
+    hit_ids = []
+    state.kill_circle.update(state.entities, hit_ids)
+    store = state.entities
+    for eid in hit_ids:
+        events.record(state.tick, telemetry.DAMAGE, eid, store.x[eid], store.y[eid],
+                      state.kill_circle.damage, telemetry.SOURCE_KILL_CIRCLE)
+
+
+""" Cleanup dead players and expired projectiles and what not"""
+
+
+def expired_entity_cleanup(state):
+    # Remove dead players and expired projectiles, dead ids go back to the store for reuse
+    for p in state.players:
+        if p.health <= 0:
+            state.entities.despawn(p.eid)
+            if state.effects is not None:
+                state.effects.emit_death(p.rect.centerx, p.rect.centery, p.color)
+            if state.telemetry is not None:
+                state.telemetry.record(state.tick, telemetry.DEATH, p.eid, p.x, p.y)
+    state.players[:] = [p for p in state.players if p.health > 0]
+    state.projectiles[:] = [
+        p for p in state.projectiles if p.lifetime > 0]
+
+    # end of the tick, index whoever is left for drawing and next tick's queries
+    index_entities(state)
+    state.history.record(state.tick, state.entities)
+
+    if state.telemetry is not None:
+        state.telemetry.record_positions(state.tick, state.players)
+        state.telemetry.end_tick()
+
+
+def index_entities(state):
+    state.player_index.clear()
+    for player in state.players:
+        state.player_index.insert(player, player.rect)
+    state.projectile_index.clear()
+    for projectile in state.projectiles:
+        state.projectile_index.insert(projectile, projectile.rect)
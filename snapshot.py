@@ -0,0 +1,113 @@
+"""
+Snapshots of a whole GameState packed into flat buffers. Taking and restoring one is a handful of
+array copies so it can run every tick for rollback, save states or branching what-if sims
+"""
+
+import hashlib
+import random
+from array import array
+
+import simulation
+from player import Projectile
+
+_PLAYER_COLUMNS = ("x", "y", "rotation", "vx", "vy", "health", "shoot_timer", "weapon", "alive")
+_PROJECTILE_STRIDE = 11  # x, y, vx, vy, width, lifetime, damage, rotation, owner id, age, lag
+
+
+class Snapshot:
+    __slots__ = ("tick", "columns", "free_ids", "count", "players", "projectiles",
+                 "projectile_owners", "kill_circle", "loot_taken", "rng_state", "_digest")
+
+    def __init__(self):
+        self._digest = None
+
+    def digest(self):
+        """Hash of the simulation state, compare between peers to catch desyncs"""
+        if self._digest is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(self.tick.to_bytes(8, "little"))
+            for column in self.columns:
+                h.update(column)
+            h.update(self.free_ids)
+            h.update(array('i', [p.eid for p in self.players]))
+            h.update(self.projectiles)
+            h.update(self.kill_circle)
+            h.update(self.loot_taken)
+            h.update(array('I', self.rng_state[1]))
+            self._digest = h.hexdigest()
+        return self._digest
+
+
+def take_snapshot(state):
+    store = state.entities
+    snap = Snapshot()
+    snap.tick = state.tick
+    snap.columns = tuple(getattr(store, name)[:] for name in _PLAYER_COLUMNS)
+    snap.free_ids = array('i', store.free_ids)
+    snap.count = store.count
+    # player handles are immutable apart from their id's columns so keeping references is enough
+    snap.players = tuple(state.players)
+
+    projectiles = array('d', bytes(8 * _PROJECTILE_STRIDE * len(state.projectiles)))
+    i = 0
+    for p in state.projectiles:
+        projectiles[i] = p.pos.x
+        projectiles[i + 1] = p.pos.y
+        projectiles[i + 2] = p.velocity.x
+        projectiles[i + 3] = p.velocity.y
+        projectiles[i + 4] = p.rect.width
+        projectiles[i + 5] = p.lifetime
+        projectiles[i + 6] = p.damage
+        projectiles[i + 7] = p.rotation
+        projectiles[i + 8] = p.owner.eid
+        projectiles[i + 9] = p.age
+        projectiles[i + 10] = p.lag
+        i += _PROJECTILE_STRIDE
+    snap.projectiles = projectiles
+    snap.projectile_owners = tuple(p.owner for p in state.projectiles)
+
+    kc = state.kill_circle
+    area = kc.safe_area
+    snap.kill_circle = array('d', (area.x, area.y, area.width, area.height, kc.shrink_timer, kc.damage))
+    # pickups are laid out once at setup, only which ones got taken changes
+    snap.loot_taken = bytes(state.loot.taken)
+    snap.rng_state = random.getstate()
+    return snap
+
+
+def restore_snapshot(state, snap):
+    store = state.entities
+    for name, column in zip(_PLAYER_COLUMNS, snap.columns):
+        getattr(store, name)[:] = column
+    store.free_ids[:] = snap.free_ids
+    store.count = snap.count
+
+    state.tick = snap.tick
+    state.players[:] = snap.players
+    store.sync_rects()
+
+    projectiles = []
+    buf = snap.projectiles
+    for n, owner in enumerate(snap.projectile_owners):
+        i = n * _PROJECTILE_STRIDE
+        p = Projectile(buf[i], buf[i + 1], buf[i + 2], buf[i + 3], owner, buf[i + 6])
+        p.rect.width = int(buf[i + 4])
+        p.lifetime = int(buf[i + 5])
+        p.rotation = buf[i + 7]
+        p.age = int(buf[i + 9])
+        p.lag = int(buf[i + 10])
+        projectiles.append(p)
+    state.projectiles[:] = projectiles
+
+    kc = state.kill_circle
+    x, y, w, h, shrink_timer, damage = snap.kill_circle
+    kc.safe_area.update(x, y, w, h)
+    kc.shrink_timer = int(shrink_timer)
+    kc.damage = damage
+    state.loot.taken[:] = snap.loot_taken
+    random.setstate(snap.rng_state)
+    simulation.index_entities(state)
+
+
+def state_hash(state):
+    return take_snapshot(state).digest()
@@ -0,0 +1,42 @@
+"""
+Uniform grid spatial hash. Objects go into every cell their rect touches so rect and radius
+queries only look at the few cells they overlap instead of everything in the world
+"""
+
+
+class SpatialHash:
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell x, cell y) -> list of objects
+
+    def clear(self):
+        self.cells.clear()
+
+    def insert(self, obj, rect):
+        cs = self.cell_size
+        cells = self.cells
+        for cy in range(rect.top // cs, (rect.bottom - 1) // cs + 1):
+            for cx in range(rect.left // cs, (rect.right - 1) // cs + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [obj]
+                else:
+                    bucket.append(obj)
+
+    def query(self, rect):
+        """Every object in the cells rect overlaps, each object only once. Callers still do
+        their own exact test since cells are coarser than the objects"""
+        cs = self.cell_size
+        cells = self.cells
+        found = []
+        seen = set()
+        for cy in range(rect.top // cs, (rect.bottom - 1) // cs + 1):
+            for cx in range(rect.left // cs, (rect.right - 1) // cs + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                for obj in bucket:
+                    if id(obj) not in seen:
+                        seen.add(id(obj))
+                        found.append(obj)
+        return found
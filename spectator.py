@@ -0,0 +1,163 @@
+"""
+Spectating a match once the human is dead or in bot only matches. The screen gets split into 2 to 4
+viewports, each with its own camera following the leader, a fight or the kill circle. Every viewport
+draws the ground and buildings from one shared WorldLayer and sprites from the shared caches in utils,
+so an extra viewport mostly costs blits
+"""
+
+import math
+
+import pygame
+
+import colors
+from camera import Camera
+from globals import SCREEN_WIDTH, SCREEN_HEIGHT
+
+LEADER, FIGHT, KILL_CIRCLE = range(3)
+_LABELS = {LEADER: "Leader", FIGHT: "Fight", KILL_CIRCLE: "Kill circle"}
+
+# what the viewports follow for each viewport count, (mode, rank) where rank 1 is the next best one
+_FOLLOW = {
+    2: ((LEADER, 0), (FIGHT, 0)),
+    3: ((LEADER, 0), (FIGHT, 0), (KILL_CIRCLE, 0)),
+    4: ((LEADER, 0), (FIGHT, 0), (FIGHT, 1), (KILL_CIRCLE, 0)),
+}
+
+_ZOOMS = (1.0, 0.7, 0.5, 0.35, 0.25)  # few zoom steps so the world layer and sprite caches get reused
+_FIGHT_RANGE = 250  # players and projectiles this close to a player count towards their fight
+_RETARGET_TICKS = 90  # how long a viewport sticks with its target before looking for a better one
+_FOLLOW_SPEED = 0.1  # fraction of the way to the target the camera moves each frame
+
+
+def _layout(count):
+    """Viewport rects in SCREEN_WIDTH x SCREEN_HEIGHT units"""
+    w, h = SCREEN_WIDTH, SCREEN_HEIGHT
+    half_w, half_h = w // 2, h // 2
+    if count == 2:
+        return [pygame.Rect(0, 0, half_w, h), pygame.Rect(half_w, 0, w - half_w, h)]
+    if count == 3:
+        return [pygame.Rect(0, 0, half_w, h), pygame.Rect(half_w, 0, w - half_w, half_h),
+                pygame.Rect(half_w, half_h, w - half_w, h - half_h)]
+    return [pygame.Rect(0, 0, half_w, half_h), pygame.Rect(half_w, 0, w - half_w, half_h),
+            pygame.Rect(0, half_h, half_w, h - half_h), pygame.Rect(half_w, half_h, w - half_w, h - half_h)]
+
+
+class Viewport:
+    def __init__(self, rect, mode, rank):
+        self.rect = rect  # where on screen, in SCREEN_WIDTH x SCREEN_HEIGHT units
+        self.mode = mode
+        self.rank = rank
+        self.camera = Camera()
+        self.zoom = 1.0
+        self.target = None  # player being followed
+        self.center = None  # smoothed world position the camera looks at
+        self.retarget_in = 0
+
+
+class Spectator:
+    def __init__(self, world_layer, count=3):
+        self.world_layer = world_layer
+        self.viewports = []
+        self._labels = {}  # mode -> rendered label
+        self.set_count(count)
+
+    def set_count(self, count):
+        count = max(2, min(4, count))
+        self.viewports = [Viewport(rect, mode, rank) for rect, (mode, rank) in zip(_layout(count), _FOLLOW[count])]
+
+    """
+    :DIRECTING
+    """
+
+    def _fight_scores(self, state):
+        """How much is going on around each player, nearby projectiles and enemies"""
+        area = pygame.Rect(0, 0, _FIGHT_RANGE * 2, _FIGHT_RANGE * 2)
+        scores = []
+        for player in state.players:
+            area.center = player.rect.center
+            score = len(state.projectile_index.query(area)) + 2 * (len(state.player_index.query(area)) - 1)
+            scores.append((-score, player.eid, player))
+        scores.sort(key=lambda s: s[:2])
+        return [player for _, _, player in scores]
+
+    def _pick(self, state, mode, taken):
+        if mode == LEADER:
+            ranked = sorted(state.players, key=lambda p: (-p.health, -p.weapon_id, p.eid))
+            return next((p for p in ranked if p not in taken), None)
+
+        # another fight has to be somewhere else, not the same fight from the other side
+        for player in self._fight_scores(state):
+            if all(math.hypot(player.x - other.x, player.y - other.y) > _FIGHT_RANGE * 2 for other in taken):
+                return player
+        return None
+
+    def update(self, state):
+        """Pick and follow targets, call once a frame before draw"""
+        players = state.players
+        taken = {LEADER: [], FIGHT: []}
+        for vp in self.viewports:
+            if vp.mode == KILL_CIRCLE:
+                safe_area = state.kill_circle.safe_area
+                goal = safe_area.center
+                # the most zoomed in step that still fits the whole safe area, with a bit of border
+                vp.zoom = _ZOOMS[-1]
+                for zoom in _ZOOMS:
+                    if vp.rect.width / zoom >= safe_area.width + 64 and vp.rect.height / zoom >= safe_area.height + 64:
+                        vp.zoom = zoom
+                        break
+            else:
+                vp.retarget_in -= 1
+                if vp.target not in players or vp.retarget_in <= 0:
+                    vp.target = self._pick(state, vp.mode, taken[vp.mode])
+                    vp.retarget_in = _RETARGET_TICKS
+                if vp.target is None:
+                    continue
+                taken[vp.mode].append(vp.target)
+                goal = vp.target.rect.center
+
+            if vp.center is None:
+                vp.center = pygame.Vector2(goal)
+            else:
+                vp.center += (pygame.Vector2(goal) - vp.center) * _FOLLOW_SPEED
+
+    """
+    :DRAW
+    """
+
+    def _label(self, mode):
+        label = self._labels.get(mode)
+        if label is None:
+            label = pygame.font.SysFont(None, 24).render(_LABELS[mode], True, colors.WHITE, colors.BLACK)
+            self._labels[mode] = label
+        return label
+
+    def draw(self, screen, scale, state):
+        """Draw every viewport into screen, which is scale render pixels per SCREEN_WIDTH unit"""
+        taken = state.loot.taken
+        for vp in self.viewports:
+            pixels = pygame.Rect(int(vp.rect.x * scale), int(vp.rect.y * scale),
+                                 int(vp.rect.width * scale), int(vp.rect.height * scale))
+            view = screen.subsurface(pixels.clip(screen.get_rect()))
+            view.fill(colors.BLACK)
+            if vp.center is None:
+                continue
+
+            camera = vp.camera
+            camera.scale = scale * vp.zoom
+            camera.resize(int(vp.rect.width / vp.zoom), int(vp.rect.height / vp.zoom))
+            camera.look_at(vp.center.x, vp.center.y)
+
+            self.world_layer.draw(view, camera)
+            for pickup in camera.visible(state.loot.index):
+                if not taken[pickup.pid]:
+                    pickup.draw(view, camera)
+            state.kill_circle.draw(view, camera)
+            for player in camera.visible(state.player_index):
+                player.draw(view, camera)
+            for projectile in camera.visible(state.projectile_index):
+                projectile.draw(view, camera)
+            if state.effects is not None:
+                state.effects.draw(view, camera)
+
+            view.blit(self._label(vp.mode), (4, 4))
+            pygame.draw.rect(view, colors.BLACK, view.get_rect(), 1)
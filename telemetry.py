@@ -0,0 +1,134 @@
+"""
+Match telemetry. The game loop appends small tuples to a per tick list and hands the whole list to a
+bounded queue once per tick, a background thread batches them into columnar chunks and writes them
+zlib compressed. If the writer falls behind whole ticks get dropped and counted instead of stalling
+the game
+"""
+
+import logging
+import queue
+import struct
+import threading
+import zlib
+from array import array
+
+# event kinds
+SHOT, DAMAGE, DEATH, POSITION = range(4)
+
+# damage sources
+SOURCE_PROJECTILE, SOURCE_KILL_CIRCLE = range(2)
+
+# record layout, one column per field: (name, array typecode)
+COLUMNS = (("tick", 'I'), ("kind", 'B'), ("eid", 'h'), ("x", 'f'), ("y", 'f'), ("value", 'f'),
+           ("source", 'b'), ("other", 'h'))
+
+_CHUNK_HEADER = struct.Struct("<4sII")  # magic, record count, compressed size
+_MAGIC = b"TLM1"
+
+log = logging.getLogger(__name__)
+
+
+class Telemetry:
+    def __init__(self, path, max_pending_ticks=600, chunk_size=8192, position_interval=30):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.position_interval = position_interval  # ticks between position samples
+
+        self.dropped = 0  # events thrown away because the writer was behind
+        self.written = 0  # events written to disk
+        self.error = None  # whatever stopped the writer thread, re-raised by close()
+        self._pending = []
+        self._queue = queue.Queue(maxsize=max_pending_ticks)
+        self._thread = threading.Thread(target=self._writer, name="telemetry-writer", daemon=True)
+        self._thread.start()
+
+    """
+    :GAME THREAD
+    """
+
+    def record(self, tick, kind, eid, x=0.0, y=0.0, value=0.0, source=-1, other=-1):
+        self._pending.append((tick, kind, eid, x, y, value, source, other))
+
+    def record_positions(self, tick, players):
+        if tick % self.position_interval:
+            return
+        pending = self._pending
+        for p in players:
+            pending.append((tick, POSITION, p.eid, p.x, p.y, p.health, -1, -1))
+
+    def end_tick(self):
+        """Hand this tick's events to the writer, never blocks"""
+        if not self._pending:
+            return
+        try:
+            self._queue.put_nowait(self._pending)
+        except queue.Full:
+            self.dropped += len(self._pending)
+        self._pending = []
+
+    def close(self, timeout=5):
+        """Flush and stop the writer, never hangs on a dead or stuck writer thread"""
+        self.end_tick()
+        if self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                log.warning("telemetry writer stuck, %s may be incomplete", self.path)
+            self._thread.join(timeout)
+        if self.error is not None:
+            raise self.error
+
+    """
+    :WRITER THREAD
+    """
+
+    def _writer(self):
+        # one file per match, a new recording to the same path replaces the old one
+        batch = []
+        try:
+            with open(self.path, "wb") as f:
+                while True:
+                    events = self._queue.get()
+                    if events is None:
+                        break
+                    batch.extend(events)
+                    if len(batch) >= self.chunk_size:
+                        self._write_chunk(f, batch)
+                        batch = []
+                if batch:
+                    self._write_chunk(f, batch)
+        except Exception as e:
+            # the game keeps going without telemetry, events just pile up as dropped
+            log.error("telemetry writer stopped: %s", e)
+            self.error = e
+
+    def _write_chunk(self, f, batch):
+        fields = list(zip(*batch))
+        raw = b"".join(array(code, column).tobytes() for (_, code), column in zip(COLUMNS, fields))
+        data = zlib.compress(raw, 6)
+        f.write(_CHUNK_HEADER.pack(_MAGIC, len(batch), len(data)))
+        f.write(data)
+        f.flush()
+        self.written += len(batch)
+
+
+def read_chunks(path):
+    """Yield each chunk of a telemetry file as a dict of column name -> array"""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(_CHUNK_HEADER.size)
+            if len(header) < _CHUNK_HEADER.size:
+                return
+            magic, count, size = _CHUNK_HEADER.unpack(header)
+            if magic != _MAGIC:
+                raise ValueError("not a telemetry chunk")
+            raw = zlib.decompress(f.read(size))
+            chunk = {}
+            offset = 0
+            for name, code in COLUMNS:
+                column = array(code)
+                length = count * column.itemsize
+                column.frombytes(raw[offset:offset + length])
+                offset += length
+                chunk[name] = column
+            yield chunk
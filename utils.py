@@ -2,3 +2,35 @@
 This file holds all of the misc constants and various reusable generic gameplay functions 
 """
 
+
+import math
+import pygame
+
+_scaled_sprites: dict = {}  # (id(surface), scale) -> (surface, scaled surface)
+_rotated_sprites: dict = {}  # (id(surface), scale, whole degrees) -> (surface, rotated scaled surface)
+
+
+def scaled_sprite(surface, scale):
+    """Get a copy of surface scaled for the current render resolution, cached per surface and scale.
+    Sizes are rounded up so neighbouring tiles never leave gaps"""
+    if scale == 1:
+        return surface
+    key = (id(surface), scale)
+    cached = _scaled_sprites.get(key)
+    if cached is None or cached[0] is not surface:
+        size = (max(1, math.ceil(surface.get_width() * scale)), max(1, math.ceil(surface.get_height() * scale)))
+        cached = (surface, pygame.transform.scale(surface, size))
+        _scaled_sprites[key] = cached
+    return cached[1]
+
+
+def rotated_sprite(surface, angle, scale):
+    """Get surface scaled then rotated by angle degrees, cached per surface, scale and whole degree
+    so every camera drawing the same sprite shares one rotation"""
+    degrees = round(angle) % 360
+    key = (id(surface), scale, degrees)
+    cached = _rotated_sprites.get(key)
+    if cached is None or cached[0] is not surface:
+        cached = (surface, pygame.transform.rotate(scaled_sprite(surface, scale), degrees))
+        _rotated_sprites[key] = cached
+    return cached[1]
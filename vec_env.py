@@ -0,0 +1,196 @@
+"""
+Gym style vectorized environment for training bot policies. Steps K independent matches in lockstep
+in this process, the controlled player in each world is the one that would normally be the human.
+Only perception (nearest targets for every bot), observations and rewards are worked out for all worlds
+at once with numpy. Movement, projectiles, collisions and the kill circle still run world by world in a
+plain python loop through the same simulation code the game uses, so step cost grows linearly with K
+"""
+
+import os
+import random
+
+import numpy as np
+import pygame
+
+import entities
+import simulation
+from game_state import GameState
+from player import Player
+from globals import WORLD_WIDTH, WORLD_HEIGHT
+
+NUM_TARGETS = 4  # enemies reported in each observation, nearest first
+OBS_SIZE = 10 + NUM_TARGETS * 4
+ACTION_SIZE = 5  # move x, move y, aim x, aim y, fire
+
+
+def _init_headless():
+    # sprites get converted on load which needs some display mode set
+    if pygame.display.get_surface() is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+
+
+class VecEnv:
+    def __init__(self, num_envs, bot_cnt=9, building_cnt=10, max_steps=3600, seed=None, map_seeds=None):
+        _init_headless()
+        if seed is not None:
+            random.seed(seed)
+        self.num_envs = num_envs
+        self.bot_cnt = bot_cnt
+        self.building_cnt = building_cnt
+        self.max_steps = max_steps
+        # episodes draw from this pool of maps cached on disk, None makes a fresh map in memory every episode
+        self.map_seeds = None if map_seeds is None else list(map_seeds)
+        self.worlds = [GameState() for _ in range(num_envs)]
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+        # padded per world columns, every world has bot_cnt + 1 entity ids since nobody spawns mid match
+        self.capacity = bot_cnt + 1
+        self._health = np.zeros((num_envs, self.capacity))
+
+    def _reset_world(self, k):
+        state = GameState()
+        map_seed = None if self.map_seeds is None else random.choice(self.map_seeds)
+        simulation.create_buildings(state, self.building_cnt, map_seed)
+        simulation.spawn_loot(state)
+        simulation.spawn_players(state, self.bot_cnt)
+        self.worlds[k] = state
+        self.steps[k] = 0
+
+    def reset(self):
+        for k in range(self.num_envs):
+            self._reset_world(k)
+        x, y, health, alive = self._gather()
+        self._health = health
+        return self._observe(x, y, health, alive)
+
+    """
+    :BATCHED WORK
+    """
+
+    def _gather(self):
+        """Stack the entity columns of every world into (K, capacity) arrays"""
+        shape = (self.num_envs, self.capacity)
+        x = np.zeros(shape)
+        y = np.zeros(shape)
+        health = np.zeros(shape)
+        alive = np.zeros(shape, dtype=bool)
+        for k, state in enumerate(self.worlds):
+            store = state.entities
+            n = store.capacity
+            x[k, :n] = np.frombuffer(store.x, dtype=np.float64)
+            y[k, :n] = np.frombuffer(store.y, dtype=np.float64)
+            health[k, :n] = np.frombuffer(store.health, dtype=np.float64)
+            alive[k, :n] = np.frombuffer(store.alive, dtype=np.int8) != 0
+        return x, y, health, alive
+
+    def _distances(self, x, y, alive):
+        """(K, N, N) distances between every pair of players in every world, dead or self pairs are inf"""
+        dx = x[:, None, :] - x[:, :, None]
+        dy = y[:, None, :] - y[:, :, None]
+        dist = np.hypot(dx, dy)
+        invalid = ~(alive[:, None, :] & alive[:, :, None])
+        invalid |= np.eye(self.capacity, dtype=bool)[None]
+        dist[invalid] = np.inf
+        return dist, dx, dy
+
+    def _nearest_ids(self, dist):
+        """Nearest visible target for every bot in every world, -1 when nobody is in view range"""
+        nearest = np.argmin(dist, axis=2)
+        in_range = np.take_along_axis(dist, nearest[:, :, None], axis=2)[:, :, 0] <= Player.view_range
+        return np.where(in_range, nearest, -1)
+
+    def _observe(self, x, y, health, alive):
+        obs = np.zeros((self.num_envs, OBS_SIZE), dtype=np.float32)
+        agents = np.array([state.human_player.eid for state in self.worlds])
+        rows = np.arange(self.num_envs)
+        vx = np.array([state.human_player.vx for state in self.worlds])
+        vy = np.array([state.human_player.vy for state in self.worlds])
+        ready = np.array([state.human_player.shoot_timer >= state.human_player.weapon.fire_interval
+                          for state in self.worlds])
+        areas = np.array([tuple(state.kill_circle.safe_area) for state in self.worlds], dtype=np.float64)
+
+        obs[:, 0] = x[rows, agents] / WORLD_WIDTH
+        obs[:, 1] = y[rows, agents] / WORLD_HEIGHT
+        obs[:, 2] = vx / Player.sprint_max_speed
+        obs[:, 3] = vy / Player.sprint_max_speed
+        obs[:, 4] = health[rows, agents] / 100
+        obs[:, 5] = ready
+        obs[:, 6] = areas[:, 0] / WORLD_WIDTH
+        obs[:, 7] = areas[:, 1] / WORLD_HEIGHT
+        obs[:, 8] = (areas[:, 0] + areas[:, 2]) / WORLD_WIDTH
+        obs[:, 9] = (areas[:, 1] + areas[:, 3]) / WORLD_HEIGHT
+
+        # nearest enemies relative to the agent
+        dist, dx, dy = self._distances(x, y, alive)
+        agent_dist = dist[rows, agents]
+        # small matches have fewer enemies than target slots, the spare slots stay 0
+        n = min(NUM_TARGETS, self.capacity - 1)
+        order = np.argsort(agent_dist, axis=1)[:, :n]
+        target_dist = np.take_along_axis(agent_dist, order, axis=1)
+        visible = target_dist <= Player.view_range
+        base = 10
+        obs[:, base::4][:, :n] = np.where(visible, np.take_along_axis(dx[rows, agents], order, axis=1) / Player.view_range, 0)
+        obs[:, base + 1::4][:, :n] = np.where(visible, np.take_along_axis(dy[rows, agents], order, axis=1) / Player.view_range, 0)
+        obs[:, base + 2::4][:, :n] = np.where(visible, np.take_along_axis(health, order, axis=1) / 100, 0)
+        obs[:, base + 3::4][:, :n] = visible
+        return obs
+
+    """
+    :STEP
+    """
+
+    def step(self, actions):
+        """actions is (K, 5): move x, move y, aim x, aim y (relative to the player), fire > 0.5.
+        Returns observations, rewards, dones and infos, finished worlds get reset straight away"""
+        actions = np.asarray(actions, dtype=np.float64)
+        move = np.clip(actions[:, :2], -1, 1)
+        move[np.abs(move) < 0.1] = 0  # dead zone so the policy can stop
+
+        # perception for every bot in every world in one go
+        x, y, health, alive = self._gather()
+        dist, _, _ = self._distances(x, y, alive)
+        nearest_ids = self._nearest_ids(dist)
+
+        # physics isn't batched, each world steps through the regular simulation
+        for k, state in enumerate(self.worlds):
+            agent = state.human_player
+            if agent in state.players:
+                agent.move_with_input(move[k, 0], move[k, 1])
+                cx, cy = agent.x + 16, agent.y + 16
+                agent.aim_and_shoot(cx + actions[k, 2], cy + actions[k, 3], actions[k, 4] > 0.5, state.projectiles)
+            entities.tick_timers(state.entities)  # same order as game.update_players
+            simulation.update_players(state, nearest_ids[k])
+            simulation.update_projectiles(state)
+            simulation.update_kill_circle(state)
+            simulation.expired_entity_cleanup(state)
+            state.tick += 1
+        self.steps += 1
+
+        # rewards from health changes across all worlds at once
+        x, y, health, alive = self._gather()
+        rows = np.arange(self.num_envs)
+        agents = np.array([state.human_player.eid for state in self.worlds])
+        lost = np.clip(self._health - health, 0, None)
+        agent_lost = lost[rows, agents]
+        enemy_lost = lost.sum(axis=1) - agent_lost
+        agent_alive = alive[rows, agents]
+        survivors = alive.sum(axis=1)
+
+        rewards = (enemy_lost - agent_lost) / 100
+        won = agent_alive & (survivors == 1)
+        rewards += np.where(won, 1.0, 0.0) - np.where(agent_alive, 0.0, 1.0)
+        dones = ~agent_alive | (survivors <= 1) | (self.steps >= self.max_steps)
+
+        obs = self._observe(x, y, health, alive)
+        infos = [{} for _ in range(self.num_envs)]
+        if dones.any():
+            for k in np.flatnonzero(dones):
+                infos[k]["final_observation"] = obs[k].copy()
+                infos[k]["won"] = bool(won[k])
+                self._reset_world(k)
+            x, y, health, alive = self._gather()
+            obs = self._observe(x, y, health, alive)
+        self._health = health
+        return obs, rewards.astype(np.float32), dones, infos
@@ -0,0 +1,29 @@
+"""
+Weapon definitions. Players store a weapon id in their entity column, the id is the index into WEAPONS
+and higher ids are better weapons so the AI can tell what's worth picking up
+"""
+
+
+class Weapon:
+    __slots__ = ("name", "damage", "bullet_speed", "fire_interval", "pellets", "spread", "lifetime", "color")
+
+    def __init__(self, name, damage, bullet_speed, fire_interval, pellets=1, spread=0, lifetime=40, color=(0, 0, 0)):
+        self.name = name
+        self.damage = damage
+        self.bullet_speed = bullet_speed
+        self.fire_interval = fire_interval  # ticks between shots for humans, bots take twice as long
+        self.pellets = pellets  # projectiles per shot
+        self.spread = spread  # degrees between the outermost pellets
+        self.lifetime = lifetime  # ticks a projectile lives for
+        self.color = color  # pickup color
+
+
+PISTOL = 0
+
+WEAPONS = [
+    Weapon("pistol", 35, 13, 30),
+    Weapon("smg", 15, 14, 8, color=(40, 120, 200)),
+    Weapon("shotgun", 14, 12, 45, pellets=5, spread=30, lifetime=22, color=(200, 120, 40)),
+    Weapon("rifle", 30, 17, 18, lifetime=50, color=(60, 160, 60)),
+    Weapon("sniper", 90, 24, 80, lifetime=70, color=(160, 40, 160)),
+]
@@ -0,0 +1,76 @@
+"""
+The static part of the world (ground tiles and buildings) prerendered into square chunks per render
+scale. Any number of cameras draw from the same chunks so the ground and buildings get rendered once
+per scale instead of tile by tile for every camera every frame. Least recently used chunks get dropped
+once there are more than max_chunks of them
+"""
+
+import math
+from collections import OrderedDict
+
+import pygame
+
+import colors
+import utils
+from globals import WORLD_WIDTH, WORLD_HEIGHT
+
+
+class WorldLayer:
+    def __init__(self, ground, building_index, chunk_size=512, max_chunks=96):
+        self.ground = ground
+        self.building_index = building_index
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self._chunks = OrderedDict()  # (scale, chunk x, chunk y) -> surface
+        self._chunk_rect = pygame.Rect(0, 0, chunk_size, chunk_size)
+
+    def clear(self):
+        """Forget every chunk, needed when the buildings change"""
+        self._chunks.clear()
+
+    def _render(self, scale, cx, cy):
+        cs = self.chunk_size
+        x0, y0 = cx * cs, cy * cs
+        # one extra pixel so neighbouring chunks overlap instead of leaving rounding gaps
+        size = math.ceil(cs * scale) + 1
+        chunk = pygame.Surface((size, size)).convert()
+        chunk.fill(colors.BLACK)
+
+        # ground tiles, the same ones Ground.draw covers
+        ground = self.ground
+        tile = utils.scaled_sprite(ground.sprite, scale)
+        tiles_x, tiles_y = int(WORLD_WIDTH / ground.width), int(WORLD_HEIGHT / ground.height)
+        for ty in range(y0 // ground.height, min(tiles_y, (y0 + cs) // ground.height + 1)):
+            for tx in range(x0 // ground.width, min(tiles_x, (x0 + cs) // ground.width + 1)):
+                chunk.blit(tile, ((tx * ground.width - x0) * scale, (ty * ground.height - y0) * scale))
+
+        # buildings overlapping the chunk, floors first then walls like Buildings.draw
+        area = self._chunk_rect
+        area.topleft = (x0, y0)
+        for building in self.building_index.query(area):
+            if area.colliderect(building.rect):
+                pos = ((building.rect.x - x0) * scale, (building.rect.y - y0) * scale)
+                chunk.blit(utils.scaled_sprite(building.floor_sprite, scale), pos)
+                chunk.blit(utils.scaled_sprite(building.wall_sprite, scale), pos)
+        return chunk
+
+    def _chunk(self, scale, cx, cy):
+        key = (scale, cx, cy)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            chunk = self._render(scale, cx, cy)
+            self._chunks[key] = chunk
+            if len(self._chunks) > self.max_chunks:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end(key)
+        return chunk
+
+    def draw(self, screen, camera):
+        cs = self.chunk_size
+        view = camera.rect
+        last_x = (WORLD_WIDTH - 1) // cs
+        last_y = (WORLD_HEIGHT - 1) // cs
+        for cy in range(max(0, view.top // cs), min(last_y, (view.bottom - 1) // cs) + 1):
+            for cx in range(max(0, view.left // cs), min(last_x, (view.right - 1) // cs) + 1):
+                screen.blit(self._chunk(camera.scale, cx, cy), camera.world_to_screen_pos(cx * cs, cy * cs))